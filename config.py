@@ -18,19 +18,52 @@ class Settings(BaseSettings):
     # Model Configuration
     MODEL_ID: str = "gpt-4o-mini"
     MAX_AGENT_STEPS: int = 6
+    TOOL_OUTPUT_FORMAT: str = "records"  # "records" (structured) or "text"
 
     # HN Configuration
     DEFAULT_THREAD_COUNT: int = 5
     MAX_THREAD_COUNT: int = 10
     MAX_COMMENTS_PER_THREAD: int = 5
+    INSIGHT_COMMENT_POOL: int = 100  # comments clustered per call; warmed for top threads
+    DIGEST_CONCURRENCY: int = 5  # parallel model calls for multi-thread summaries
+
+    # Upstream fetch limits (shared by every session in the process)
+    HN_MAX_CONCURRENCY: int = 16
+    HN_RATE_LIMIT_PER_SECOND: float = 20.0  # 0 disables rate limiting
+    HN_RATE_BURST: int = 40
+    HN_BACKGROUND_QUEUE_LIMIT: int = 200
+
+    # Linked-article fetching
+    ARTICLE_PER_HOST_LIMIT: int = 2
+    ARTICLE_TIMEOUT_SECONDS: int = 5
+    ARTICLE_MAX_BYTES: int = 2_000_000
+    ARTICLE_FRESH_SECONDS: int = 3600  # revalidate with ETag/Last-Modified after this
 
     # Cache Configuration
     ENABLE_CACHE: bool = True
     CACHE_TTL_SECONDS: int = 300  # 5 minutes
+    CACHE_BACKEND: str = "memory"  # "memory" or "disk" (shared across workers)
+    CACHE_PATH: str = ".cache/hn_cache.sqlite3"
+    CACHE_MAX_ENTRIES: int = 10_000  # memory backend only, least recently used evicted
+    CACHE_REFRESH_SECONDS: int = 120  # keep below CACHE_TTL_SECONDS
+    WARMUP_ON_START: bool = True
+
+    # Snapshots
+    SNAPSHOT_DIR: str = ".snapshots"
+    SNAPSHOT_FORMAT: str = "jsonl"  # "jsonl" (gzip) or "parquet" (needs pyarrow)
+    HN_REPLAY_DIR: Optional[str] = None  # serve HN data from a snapshot, offline
 
     # UI Configuration
     GRADIO_PORT: int = 7860
     GRADIO_SHARE: bool = False
+    GRADIO_WORKERS: int = 1  # >1 runs one process per port; requires CACHE_BACKEND=disk
+
+    # Telegram bot
+    TELEGRAM_BOT_TOKEN: Optional[str] = None
+    TELEGRAM_WITH_GRADIO: bool = False  # also serve the bot from the Gradio process
+    TELEGRAM_MAX_WORKERS: int = 8  # concurrent agent runs
+    TELEGRAM_MAX_PENDING_PER_CHAT: int = 3
+    TELEGRAM_MAX_CHATS: int = 1000  # per-chat agents kept in memory
 
     # Logging
     LOG_LEVEL: str = "INFO"
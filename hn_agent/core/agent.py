@@ -1,15 +1,33 @@
 """HackerNews Agent using smolagents CodeAgent."""
+import hashlib
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from smolagents import CodeAgent, InferenceClientModel, LiteLLMModel, OpenAIServerModel
-from smolagents.models import ApiModel
+from smolagents import CodeAgent
 from smolagents.monitoring import LogLevel
 
-from hn_agent.core.prompts import AGENT_DESCRIPTION, AGENT_INSTRUCTIONS, AGENT_NAME
-from hn_agent.tools.tools import ExtractCommentInsightsTool, FetchTopStoriesToolTool
+from hn_agent.core.digest import DigestBuilder
+from hn_agent.core.memory import MemoryCompactor
+from hn_agent.core.prompts import (
+    AGENT_DESCRIPTION,
+    AGENT_INSTRUCTIONS,
+    AGENT_NAME,
+    PROMPT_VERSION,
+)
+from hn_agent.core.usage import UsageLogger
+from hn_agent.services.article_service import ArticleService
+from hn_agent.services.hn_service import HNService
+from hn_agent.tools.tools import (
+    ExtractCommentInsightsTool,
+    FetchStoryArticlesTool,
+    FetchTopStoriesToolTool,
+    SummarizeTopThreadsTool,
+)
 from hn_agent.utils.logger import logger
 
+if TYPE_CHECKING:
+    from smolagents.models import ApiModel
+
 
 def _build_model(
     provider: str,
@@ -17,21 +35,31 @@ def _build_model(
     hf_token: Optional[str] = None,
     openai_api_key: Optional[str] = None,
     gemini_api_key: Optional[str] = None,
-) -> ApiModel:
-    """Build the right model instance based on the provider setting."""
+) -> "ApiModel":
+    """Build the right model instance based on the provider setting.
+
+    Provider classes are imported inside their branch so a process only pays
+    for the stack it actually uses.
+    """
     if provider == "openai":
         if not openai_api_key:
             raise ValueError("OPENAI_API_KEY is required when MODEL_PROVIDER=openai")
+        from smolagents import OpenAIServerModel
+
         logger.info(f"Using OpenAI provider with model: {model_id}")
         return OpenAIServerModel(model_id=model_id, api_key=openai_api_key)
 
     if provider == "gemini":
         if not gemini_api_key:
             raise ValueError("GEMINI_API_KEY is required when MODEL_PROVIDER=gemini")
+        from smolagents import LiteLLMModel
+
         logger.info(f"Using Gemini provider with model: {model_id}")
         return LiteLLMModel(model_id=model_id, api_key=gemini_api_key)
 
     if provider == "hf_inference":
+        from smolagents import InferenceClientModel
+
         logger.info(f"Using HF Inference provider with model: {model_id}")
         return InferenceClientModel(model_id=model_id, token=hf_token)
 
@@ -40,6 +68,53 @@ def _build_model(
     )
 
 
+def _stabilize_system_prompt(agent: CodeAgent) -> None:
+    """Make the rendered system prompt byte-identical across processes.
+
+    Some smolagents versions build `authorized_imports` from a set, whose order
+    changes with each process's hash seed. That reorders the system prompt and
+    defeats provider prompt caching across workers and restarts.
+    """
+    agent.authorized_imports = sorted(agent.authorized_imports)
+    # Older versions render the prompt once at init; newer ones on each access.
+    if not isinstance(getattr(type(agent), "system_prompt", None), property):
+        agent.system_prompt = agent.initialize_system_prompt()
+
+    fingerprint = hashlib.sha256(agent.system_prompt.encode()).hexdigest()[:12]
+    logger.info(
+        f"Prompt prefix {PROMPT_VERSION}: {len(agent.system_prompt)} chars, sha256 {fingerprint}"
+    )
+
+
+def create_digest_builder(
+    provider: str = "gemini",
+    model_id: str = "gemini/gemini-2.5-flash",
+    hf_token: Optional[str] = None,
+    openai_api_key: Optional[str] = None,
+    gemini_api_key: Optional[str] = None,
+    hn_service: Optional[HNService] = None,
+    digest_concurrency: int = 5,
+    digest_max_comments: int = 5,
+) -> DigestBuilder:
+    """Create a standalone DigestBuilder with its own model client.
+
+    For frontends that serve digests directly, without an agent run.
+    """
+    model = _build_model(
+        provider=provider,
+        model_id=model_id,
+        hf_token=hf_token,
+        openai_api_key=openai_api_key,
+        gemini_api_key=gemini_api_key,
+    )
+    return DigestBuilder(
+        model,
+        hn_service or HNService(),
+        max_workers=digest_concurrency,
+        max_comments=digest_max_comments,
+    )
+
+
 def create_hn_agent(
     provider: str = "gemini",
     model_id: str = "gemini/gemini-2.5-flash",
@@ -47,16 +122,26 @@ def create_hn_agent(
     openai_api_key: Optional[str] = None,
     gemini_api_key: Optional[str] = None,
     max_steps: int = 6,
+    hn_service: Optional[HNService] = None,
+    article_service: Optional[ArticleService] = None,
+    digest_concurrency: int = 5,
+    digest_max_comments: int = 5,
+    tool_output_format: str = "records",
+    comment_pool_size: int = 100,
 ) -> CodeAgent:
-    """Create a configured HackerNews CodeAgent."""
-    logger.info(f"Creating HN agent (provider={provider}, model={model_id})")
+    """Create a configured HackerNews CodeAgent.
 
-    tools = [
-        FetchTopStoriesToolTool(),
-        ExtractCommentInsightsTool(),
-    ]
+    Pass a shared `hn_service` and `article_service` so every tool (and every
+    agent in the process) reads from the same caches. `digest_concurrency`
+    caps the parallel model calls made by `summarize_top_threads`, and
+    `digest_max_comments` is how many comments each digested thread includes.
+    `tool_output_format` is "records" (structured, compact) or "text".
+    `comment_pool_size` is how many comments `extract_comment_insights`
+    clusters before picking representatives.
+    """
+    logger.info(f"Creating HN agent (provider={provider}, model={model_id})")
 
-    logger.info(f"Loaded {len(tools)} tools: {[t.name for t in tools]}")
+    hn_service = hn_service or HNService()
 
     model = _build_model(
         provider=provider,
@@ -66,6 +151,26 @@ def create_hn_agent(
         gemini_api_key=gemini_api_key,
     )
 
+    tools = [
+        FetchTopStoriesToolTool(hn_service, output_format=tool_output_format),
+        FetchStoryArticlesTool(hn_service, article_service),
+        ExtractCommentInsightsTool(
+            hn_service,
+            output_format=tool_output_format,
+            comment_pool_size=comment_pool_size,
+        ),
+        SummarizeTopThreadsTool(
+            DigestBuilder(
+                model,
+                hn_service,
+                max_workers=digest_concurrency,
+                max_comments=digest_max_comments,
+            )
+        ),
+    ]
+
+    logger.info(f"Loaded {len(tools)} tools: {[t.name for t in tools]}")
+
     # Enable smolagents internal logger for terminal visibility
     smolagents_logger = logging.getLogger("smolagents")
     if not smolagents_logger.handlers:
@@ -83,8 +188,10 @@ def create_hn_agent(
         description=AGENT_DESCRIPTION,
         instructions=AGENT_INSTRUCTIONS,
         max_steps=max_steps,
+        step_callbacks=[MemoryCompactor(), UsageLogger()],
         verbosity_level=LogLevel.DEBUG,
     )
+    _stabilize_system_prompt(agent)
 
     logger.info("HN agent created successfully")
     return agent
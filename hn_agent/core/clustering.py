@@ -0,0 +1,224 @@
+"""Local comment clustering: sparse TF-IDF plus spherical mini-batch k-means.
+
+Used to condense a large discussion before it reaches the model. Comments are
+grouped by vocabulary, and a few comments closest to each cluster centroid
+stand in for the rest. Runs on CPU in milliseconds for a thousand comments.
+"""
+import html
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+_TAG = re.compile(r"<[^>]+>")
+_URL = re.compile(r"https?://\S+")
+_TOKEN = re.compile(r"[a-z][a-z0-9+#'-]*[a-z0-9+#]")
+
+STOP_WORDS = frozenset(
+    """
+    a about above after again against all also am an and any are aren't as at
+    be because been before being below between both but by can can't cannot
+    could couldn't did didn't do does doesn't doing don't down during each even
+    few for from further get gets got had hadn't has hasn't have haven't having
+    he her here hers herself him himself his how i i'd i'll i'm i've if in into
+    is isn't it it's its itself just know let's like lot make many may me might
+    more most much must my myself need no nor not now of off on once one only
+    or other ought our ours ourselves out over own people pretty probably quite
+    really same say see she should shouldn't so some still such than that
+    that's the their theirs them themselves then there there's these they
+    they'd they'll they're they've thing things think this those though through
+    to too under until up use used using very want was wasn't way we we'd we'll
+    we're we've well were weren't what what's when where which while who whom
+    why will with won't work would wouldn't yeah yes yet you you'd you'll
+    you're you've your yours yourself yourselves
+    """.split()
+)
+
+
+@dataclass
+class CommentCluster:
+    """One discussion thread: its size, top terms and representative comments."""
+
+    size: int
+    terms: List[str]
+    representatives: List[int] = field(default_factory=list)  # indices into the input
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens of an HN comment (HTML and URLs removed)."""
+    text = html.unescape(_URL.sub(" ", _TAG.sub(" ", text or ""))).lower()
+    return [t for t in _TOKEN.findall(text) if t not in STOP_WORDS]
+
+
+def tfidf_matrix(
+    documents: Sequence[str], max_features: int = 5000, min_df: int = 2
+) -> Tuple[sparse.csr_matrix, List[str]]:
+    """Return L2-normalized TF-IDF rows (CSR) and the vocabulary.
+
+    Term frequency is sublinear (1 + log tf). Terms in fewer than `min_df`
+    documents are dropped, unless that would leave no vocabulary at all.
+    """
+    tokenized = [tokenize(doc) for doc in documents]
+    doc_freq = Counter(term for tokens in tokenized for term in set(tokens))
+    ranked = doc_freq.most_common(max_features)
+    vocabulary = [term for term, df in ranked if df >= min_df] or [t for t, _ in ranked]
+    index: Dict[str, int] = {term: i for i, term in enumerate(vocabulary)}
+
+    indptr = [0]
+    indices: List[int] = []
+    counts: List[float] = []
+    for tokens in tokenized:
+        term_counts = Counter(index[t] for t in tokens if t in index)
+        indices.extend(term_counts.keys())
+        counts.extend(term_counts.values())
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float32), indices, indptr),
+        shape=(len(documents), len(vocabulary)),
+    )
+    matrix.data = 1.0 + np.log(matrix.data)
+    df = np.array([doc_freq[term] for term in vocabulary], dtype=np.float32)
+    idf = np.log((1.0 + len(documents)) / (1.0 + df)) + 1.0
+    matrix = matrix @ sparse.diags(idf)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix), vocabulary
+
+
+def minibatch_kmeans(
+    matrix: sparse.csr_matrix,
+    n_clusters: int,
+    batch_size: int = 256,
+    iterations: int = 30,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical mini-batch k-means on L2-normalized rows.
+
+    Similarity is cosine (a dot product on unit rows). Centroids are seeded
+    with k-means++ and updated with per-centroid learning rates as in Sculley
+    (2010). Returns (labels, unit-norm centroids).
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = matrix.shape[0]
+    centroids = _kmeans_plus_plus(matrix, n_clusters, rng)
+    seen = np.zeros(n_clusters)
+
+    for _ in range(iterations):
+        batch = (
+            np.arange(n_rows) if n_rows <= batch_size
+            else rng.choice(n_rows, batch_size, replace=False)
+        )
+        rows = matrix[batch]
+        labels = np.asarray((rows @ centroids.T).argmax(axis=1)).ravel()
+        for cluster in np.unique(labels):
+            members = rows[labels == cluster]
+            seen[cluster] += members.shape[0]
+            rate = members.shape[0] / seen[cluster]
+            mean = np.asarray(members.mean(axis=0)).ravel()
+            centroids[cluster] = (1 - rate) * centroids[cluster] + rate * mean
+        centroids = _normalize(centroids)
+
+    labels = np.asarray((matrix @ centroids.T).argmax(axis=1)).ravel()
+    return labels, centroids
+
+
+def cluster_comments(
+    texts: Sequence[str],
+    representatives: int = 20,
+    max_clusters: int = 8,
+    top_terms: int = 4,
+) -> List[CommentCluster]:
+    """Group comments into discussion threads and pick representative comments.
+
+    The cluster count grows with the square root of the input size, up to
+    `max_clusters`. The `representatives` slots are split across clusters in
+    proportion to their size, with at least one each. Within a cluster the
+    comments closest to the centroid are chosen. Clusters come back largest
+    first.
+    """
+    if not texts:
+        return []
+
+    matrix, vocabulary = tfidf_matrix(texts)
+    # Comments with no vocabulary terms ("+1", a bare link) are left out.
+    non_empty = np.flatnonzero(np.diff(matrix.indptr))
+    if len(non_empty) == 0:
+        return [CommentCluster(len(texts), [], list(range(min(representatives, len(texts)))))]
+
+    rows = matrix[non_empty]
+    n_clusters = max(1, min(max_clusters, round(math.sqrt(len(non_empty) / 2))))
+    labels, centroids = minibatch_kmeans(rows, n_clusters)
+    similarity = np.asarray(rows @ centroids.T).max(axis=1)
+
+    sizes = np.bincount(labels, minlength=n_clusters)
+    order = [c for c in np.argsort(-sizes) if sizes[c] > 0]
+    slots = _allocate(sizes[order], representatives)
+
+    clusters = []
+    for cluster, count in zip(order, slots):
+        members = np.flatnonzero(labels == cluster)
+        closest = members[np.argsort(-similarity[members])][:count]
+        terms = [vocabulary[i] for i in np.argsort(-centroids[cluster])[:top_terms]]
+        clusters.append(
+            CommentCluster(
+                size=int(sizes[cluster]),
+                terms=terms,
+                representatives=sorted(int(non_empty[i]) for i in closest),
+            )
+        )
+    return clusters
+
+
+def _kmeans_plus_plus(
+    matrix: sparse.csr_matrix, n_clusters: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Seed centroids far apart: each pick is sampled by squared cosine distance."""
+    n_rows = matrix.shape[0]
+    chosen = [int(rng.integers(n_rows))]
+    distance = 1.0 - (matrix @ matrix[chosen[0]].T).toarray().ravel()
+    for _ in range(1, n_clusters):
+        weights = np.clip(distance, 0, None) ** 2
+        if weights.sum() == 0:
+            break  # fewer distinct rows than clusters
+        pick = int(rng.choice(n_rows, p=weights / weights.sum()))
+        chosen.append(pick)
+        distance = np.minimum(distance, 1.0 - (matrix @ matrix[pick].T).toarray().ravel())
+
+    centroids = np.zeros((n_clusters, matrix.shape[1]))
+    centroids[: len(chosen)] = matrix[chosen].toarray()
+    return centroids
+
+
+def _normalize(centroids: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return centroids / norms
+
+
+def _allocate(sizes: np.ndarray, slots: int) -> List[int]:
+    """Split `slots` across clusters (sorted largest first) in proportion to size.
+
+    Every cluster gets at least one slot while slots last. The rest are shared
+    by largest remainder, capped at each cluster's size.
+    """
+    counts = np.zeros(len(sizes), dtype=int)
+    counts[:slots] = 1
+    remaining = slots - int(counts.sum())
+    if remaining > 0:
+        quota = sizes / sizes.sum() * remaining
+        counts += np.minimum(np.floor(quota).astype(int), sizes - counts)
+        target = min(slots, int(sizes.sum()))
+        for i in np.argsort(-(quota - np.floor(quota))):
+            if counts.sum() >= target:
+                break
+            if counts[i] < sizes[i]:
+                counts[i] += 1
+        while counts.sum() < target:
+            counts[int(np.argmax(sizes - counts))] += 1
+    return [int(c) for c in counts]
@@ -0,0 +1,130 @@
+"""Map-reduce digest of the top Hacker News threads.
+
+Map: each story and its comments is summarized by its own model call, run
+concurrently (at most `max_workers` at once), so each call has a small
+context and wall-clock time tracks the slowest thread, not the sum.
+Reduce: the per-thread sections are assembled into MULTI_THREAD_TEMPLATE.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from hn_agent.core.prompts import (
+    DIGEST_MAP_PROMPT,
+    ERROR_API_FAILURE,
+    MULTI_THREAD_TEMPLATE,
+    THREAD_SUMMARY_TEMPLATE,
+    format_time_ago,
+    truncate_text,
+)
+from hn_agent.services.hn_service import HNService
+from hn_agent.utils.logger import logger
+
+
+class DigestBuilder:
+    """Builds a multi-thread digest with parallel per-thread model calls."""
+
+    def __init__(
+        self,
+        model: Any,
+        hn_service: HNService,
+        max_workers: int = 5,
+        max_comments: int = 5,
+    ) -> None:
+        self.model = model
+        self.hn_service = hn_service
+        self.max_workers = max_workers
+        self.max_comments = max_comments
+
+    def build(self, count: int = 5) -> str:
+        """Return the markdown digest for the top `count` threads."""
+        stories = self.hn_service.get_top_stories(count=count)
+        if not stories:
+            return ERROR_API_FAILURE
+
+        logger.info(f"Digest: summarizing {len(stories)} threads in parallel")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stories))) as pool:
+            sections = list(
+                pool.map(self._summarize_thread, range(1, len(stories) + 1), stories)
+            )
+        return self._reduce(sections)
+
+    def _summarize_thread(self, rank: int, story: Dict[str, Any]) -> str:
+        comments = self.hn_service.get_comments(story["id"], self.max_comments)
+        comment_lines = "\n".join(
+            f"- ({c.get('by', 'anonymous')}) {truncate_text(c.get('text', ''), 300)}"
+            for c in comments
+        ) or "(no comments yet)"
+
+        prompt = DIGEST_MAP_PROMPT.format(
+            title=story.get("title", "N/A"),
+            url=story.get("url", "N/A"),
+            score=story.get("score", 0),
+            comments_count=story.get("descendants", 0),
+            comments=comment_lines,
+        )
+        try:
+            fields = self._parse_fields(self._generate(prompt))
+        except Exception as e:
+            logger.error(f"Digest map call failed for story {story['id']}: {e}")
+            fields = {
+                "summary": "Summary unavailable.",
+                "popularity_analysis": "N/A",
+                "top_comments_summary": "N/A",
+            }
+
+        return THREAD_SUMMARY_TEMPLATE.format(
+            rank=rank,
+            title=story.get("title", "N/A"),
+            score=story.get("score", 0),
+            comments_count=story.get("descendants", 0),
+            time_ago=format_time_ago(story["time"]) if story.get("time") else "N/A",
+            url=story.get("url", "N/A"),
+            **fields,
+        )
+
+    @staticmethod
+    def _reduce(sections: List[str]) -> str:
+        return MULTI_THREAD_TEMPLATE.format(
+            count=len(sections), threads="\n".join(sections)
+        )
+
+    def _generate(self, prompt: str) -> str:
+        messages = [{"role": "user", "content": [{"type": "text", "text": prompt}]}]
+        response = self.model.generate(messages)
+        return response.content if isinstance(response.content, str) else str(response.content)
+
+    @staticmethod
+    def _parse_fields(text: str) -> Dict[str, str]:
+        """Read the JSON object in the reply (code fences allowed); fall back to raw text.
+
+        A reply that is a JSON array uses its first object.
+        """
+        body = text.strip().strip("`")
+        if body.startswith("json"):
+            body = body[len("json"):]
+        start, end = text.find("{"), text.rfind("}")
+
+        data = None
+        for candidate in (body, text[start:end + 1]):
+            try:
+                data = json.loads(candidate)
+                break
+            except ValueError:
+                continue
+        if isinstance(data, list):
+            data = next((item for item in data if isinstance(item, dict)), None)
+        if not isinstance(data, dict):
+            return {
+                "summary": text.strip(),
+                "popularity_analysis": "N/A",
+                "top_comments_summary": "N/A",
+            }
+
+        fields = {}
+        for key in ("summary", "popularity_analysis", "top_comments_summary"):
+            value = data.get(key, "N/A")
+            if isinstance(value, list):
+                value = "\n".join(str(v) for v in value)
+            fields[key] = str(value).strip()
+        return fields
@@ -0,0 +1,95 @@
+"""Agent memory compaction for multi-turn chats.
+
+Without it, every new question replays the full tool observations of all
+earlier turns (whole story lists and comment dumps). Compaction shrinks an
+old observation to the Story ID / Title lines it mentions, which is what
+follow-up questions usually refer back to. Steps of the current question are
+left untouched, so the model sees full data for the question at hand.
+"""
+import re
+from typing import Any, List, Optional
+
+from smolagents.memory import ActionStep, TaskStep
+
+from hn_agent.utils.logger import logger
+
+COMPACTED_PREFIX = "[Compacted output from an earlier question"
+
+# Rough chars-per-token ratio used for savings estimates.
+CHARS_PER_TOKEN = 4
+
+# Header and rows of a printed story table: "id | title | ..." then "<id> | <title> | ..."
+_STORY_HEADER = "id | title |"
+_STORY_ROW = re.compile(r"^(\d+) \| ([^|]+)")
+
+
+def summarize_observation(text: str, max_chars: int = 400) -> str:
+    """Reduce a tool observation to the story references it contains."""
+    references = []
+    in_story_table = False
+    for line in text.splitlines():
+        line = line.strip()
+        row = _STORY_ROW.match(line) if in_story_table else None
+        if row:
+            references.append(f"Story ID: {row.group(1)} | Title: {row.group(2).strip()}")
+            continue
+        # Rows only count under a story table header, never under a comment table
+        in_story_table = line.startswith(_STORY_HEADER)
+        if line.startswith(("Story ID:", "Title:")):
+            references.append(line)
+    summary = f"{COMPACTED_PREFIX}, {len(text)} chars]"
+    if references:
+        summary += "\n" + "\n".join(references)
+    if len(summary) > max_chars:
+        summary = summary[:max_chars].rsplit("\n", 1)[0] + "\n..."
+    return summary
+
+
+def compact_memory(
+    steps: List[Any], max_chars: int = 400, keep_current_turn: bool = True
+) -> int:
+    """Compact observations of earlier turns in place. Returns chars saved.
+
+    With `keep_current_turn`, steps after the last TaskStep (the question being
+    answered) are kept verbatim. Compaction is idempotent, so the prompt prefix
+    stays byte-identical for the rest of a turn.
+    """
+    boundary = len(steps)
+    if keep_current_turn:
+        task_indices = [i for i, step in enumerate(steps) if isinstance(step, TaskStep)]
+        if task_indices:
+            boundary = task_indices[-1]
+
+    saved = 0
+    for step in steps[:boundary]:
+        if not isinstance(step, ActionStep) or getattr(step, "is_final_answer", False):
+            continue
+        # Full prompts of past steps are never re-sent; drop them to free memory.
+        step.model_input_messages = None
+        observations = step.observations
+        if (
+            not observations
+            or observations.startswith(COMPACTED_PREFIX)
+            or len(observations) <= max_chars
+        ):
+            continue
+        step.observations = summarize_observation(observations, max_chars)
+        saved += len(observations) - len(step.observations)
+    return saved
+
+
+class MemoryCompactor:
+    """Step callback that compacts earlier turns and logs the tokens saved."""
+
+    def __init__(self, max_observation_chars: int = 400) -> None:
+        self.max_observation_chars = max_observation_chars
+
+    def __call__(self, memory_step: ActionStep, agent: Optional[Any] = None) -> None:
+        if agent is None:
+            return
+
+        saved = compact_memory(agent.memory.steps, self.max_observation_chars)
+        if saved:
+            logger.info(
+                f"Memory compaction saved ~{saved // CHARS_PER_TOKEN} prompt tokens per call"
+            )
@@ -6,6 +6,8 @@ The agent follows the smolagents Thought -> Action -> Observation cycle:
   - Action: call the right tool(s) via code
   - Observation: interpret tool output and respond
 """
+import time
+from typing import Optional
 
 # --- Agent identity -----------------------------------------------------------
 
@@ -18,20 +20,33 @@ AGENT_DESCRIPTION = (
 
 # --- System instructions (fed to CodeAgent as `instructions`) -----------------
 # These guide the Thought-Action-Observation loop.
+#
+# The instructions, the tool descriptions and the smolagents system prompt form
+# the prompt prefix sent on every model call. Providers cache a prefix that is
+# byte-identical across requests, so keep it static: never interpolate dates,
+# user data or fetched content here. All volatile content belongs in the task
+# and the step history, which come after it. Bump PROMPT_VERSION on any edit
+# so cache-hit changes can be traced to a prompt change.
+
+PROMPT_VERSION = "v2"
 
 AGENT_INSTRUCTIONS = """\
 You are a Hacker News analyst that helps tech professionals stay current.
 
 ## Your tools
-- `fetch_top_stories(num_stories)`: Fetch top N stories. Returns Story ID, title, score, comments, URL, and engagement metrics.
-- `extract_comment_insights(story_id, max_comments)`: Get top comments for a story. Pass the numeric **Story ID** from fetch results.
+- `fetch_top_stories(num_stories)`: Fetch top N stories with their Story ID, title, score, comments, URL, and engagement metrics.
+- `fetch_story_articles(num_stories)`: Fetch the linked articles of the top N stories in one call. Returns Story ID, title, URL, and the article's main text.
+- `extract_comment_insights(story_id, max_comments)`: Get the main discussion threads of a story as representative comments grouped by topic cluster. Pass the numeric **Story ID** from fetch results.
+- `summarize_top_threads(num_stories)`: Build a complete markdown digest of the top N stories and their discussions.
 
 ## Rules
 1. Call `fetch_top_stories` ONCE to get stories. Do NOT call it in a loop or re-fetch.
-2. When calling `extract_comment_insights`, use the numeric **Story ID** from the fetch output (e.g. 42415051). Never pass a URL or index number.
+2. When calling `extract_comment_insights`, use the numeric **Story ID** from the fetch output (e.g. 42415051). If the tool returned a list of dicts, read it directly (`stories[0]["id"]`) instead of parsing printed text. Never pass a URL or index number.
 3. You can summarize and analyze stories yourself from the fetch output — no extra tool needed.
 4. For broad requests ("what's trending", "give me a rundown"), fetch stories and present them directly.
 5. Only call `extract_comment_insights` when the user specifically asks about discussions or comments.
+6. When the user asks what a story is about or why it's popular, call `fetch_story_articles` ONCE with the same count instead of guessing from the title.
+7. For requests to summarize several top stories together with their discussions, call `summarize_top_threads` ONCE and return its output as your final answer. Do not call other tools for the same request.
 
 ## Output rules
 - Your final answer is the ONLY thing the user sees.
@@ -71,6 +86,25 @@ MULTI_THREAD_TEMPLATE = """\
 *Ask me anything about these threads!*
 """
 
+# --- Map-reduce digest --------------------------------------------------------
+# Sent once per thread, in parallel; the answers fill THREAD_SUMMARY_TEMPLATE.
+
+DIGEST_MAP_PROMPT = """\
+Summarize this Hacker News thread for a tech professional.
+
+Title: {title}
+URL: {url}
+Score: {score} | Comments: {comments_count}
+
+Top comments:
+{comments}
+
+Reply with a JSON object only, with these keys:
+- "summary": 2-3 sentences on what the story is about
+- "popularity_analysis": 1-2 sentences on why it is trending
+- "top_comments_summary": 2-4 markdown bullet points with the main community takes
+"""
+
 # --- Error messages -----------------------------------------------------------
 
 ERROR_NO_THREADS = (
@@ -102,6 +136,16 @@ def format_thread_list(threads: list) -> str:
     )
 
 
+def format_time_ago(timestamp: int, now: Optional[float] = None) -> str:
+    """Format a Unix timestamp as a short relative time ("3h ago")."""
+    seconds = max(int((now or time.time()) - timestamp), 0)
+    if seconds < 3600:
+        return f"{seconds // 60}m ago"
+    if seconds < 86400:
+        return f"{seconds // 3600}h ago"
+    return f"{seconds // 86400}d ago"
+
+
 def truncate_text(text: str, max_length: int = 200) -> str:
     """Truncate text at a word boundary with an ellipsis."""
     if len(text) <= max_length:
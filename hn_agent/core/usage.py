@@ -0,0 +1,45 @@
+"""Per-call token usage logging, including provider prompt-cache hits.
+
+OpenAI and LiteLLM (which normalizes Gemini and others) report cached input
+tokens under `usage.prompt_tokens_details.cached_tokens` in the raw response
+that smolagents keeps on the step's `model_output_message.raw`. Providers
+that do not report it are logged without a cached count.
+"""
+from typing import Any, Optional
+
+from hn_agent.utils.logger import logger
+
+
+def _field(obj: Any, name: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def cached_prompt_tokens(raw_response: Any) -> Optional[int]:
+    """Return the cached prompt-token count from a raw provider response."""
+    usage = _field(raw_response, "usage")
+    cached = _field(_field(usage, "prompt_tokens_details"), "cached_tokens")
+    if cached is None:
+        # Native Gemini responses
+        cached = _field(_field(raw_response, "usage_metadata"), "cached_content_token_count")
+    return cached if isinstance(cached, int) else None
+
+
+class UsageLogger:
+    """Step callback that logs input, cached and output tokens per model call."""
+
+    def __call__(self, memory_step: Any, agent: Optional[Any] = None) -> None:
+        usage = getattr(memory_step, "token_usage", None)
+        if usage is None:
+            return
+
+        message = getattr(memory_step, "model_output_message", None)
+        cached = cached_prompt_tokens(getattr(message, "raw", None))
+        cached_info = f" ({cached} from provider cache)" if cached is not None else ""
+        logger.info(
+            f"Step {memory_step.step_number}: {usage.input_tokens} input tokens"
+            f"{cached_info}, {usage.output_tokens} output tokens"
+        )
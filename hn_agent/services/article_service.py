@@ -0,0 +1,261 @@
+"""Linked-article fetching with main-text extraction and HTTP revalidation."""
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from hn_agent.services.cache import Cache, MemoryCache
+from hn_agent.utils.logger import logger
+
+# Elements that never hold article body text.
+_BOILERPLATE_TAGS = [
+    "script", "style", "noscript", "nav", "header", "footer",
+    "aside", "form", "svg", "iframe", "button",
+]
+
+_TEXT_TAGS = ["h1", "h2", "h3", "p", "li", "pre", "blockquote"]
+
+MAX_REDIRECTS = 5
+
+
+class BlockedURLError(ValueError):
+    """Raised for URLs that must not be fetched (bad scheme or non-public host)."""
+
+
+def check_public_url(url: str) -> None:
+    """Raise BlockedURLError unless `url` is http(s) and every address of its host is public.
+
+    Story URLs are user-submitted, so without this check a link could make
+    the server fetch loopback, link-local (cloud metadata) or private-network
+    addresses.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise BlockedURLError(f"Unsupported URL: {url}")
+    try:
+        addresses = socket.getaddrinfo(parsed.hostname, parsed.port, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise BlockedURLError(f"Cannot resolve {parsed.hostname}: {e}") from e
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+        if not address.is_global or address.is_multicast:
+            raise BlockedURLError(f"Refusing non-public address {address} for {url}")
+
+
+def extract_main_text(html: Union[str, bytes], max_chars: int = 4000) -> Tuple[str, str]:
+    """Return (title, main text) from an HTML page.
+
+    Raw bytes are accepted so BeautifulSoup can sniff the charset from the
+    page's <meta> tag.
+
+    Prefers <article> or <main>. Otherwise picks the element whose direct <p>
+    children hold the most text, which is the usual readability heuristic.
+    """
+    soup = BeautifulSoup(html, "lxml")
+    title = soup.title.get_text(strip=True) if soup.title else ""
+
+    for tag in soup(_BOILERPLATE_TAGS):
+        tag.decompose()
+
+    root = soup.find("article") or soup.find("main") or _densest_block(soup)
+    if root is None:
+        root = soup.body or soup
+
+    # Skip blocks nested in other blocks (e.g. <p> inside <li>) to avoid duplicates.
+    blocks = [
+        el.get_text(" ", strip=True)
+        for el in root.find_all(_TEXT_TAGS)
+        if el.find_parent(_TEXT_TAGS) is None
+    ]
+    text = "\n\n".join(b for b in blocks if b)
+    if not text:
+        text = root.get_text(" ", strip=True)
+
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(" ", 1)[0] + "..."
+    return title, text
+
+
+def _densest_block(soup: BeautifulSoup) -> Optional[Any]:
+    scores: Dict[int, Tuple[int, Any]] = {}
+    for p in soup.find_all("p"):
+        parent = p.parent
+        if parent is None:
+            continue
+        length = len(p.get_text(strip=True))
+        prev = scores.get(id(parent), (0, parent))[0]
+        scores[id(parent)] = (prev + length, parent)
+    if not scores:
+        return None
+    return max(scores.values(), key=lambda entry: entry[0])[1]
+
+
+class ArticleService:
+    """Fetches the pages linked from HN stories.
+
+    Pages are fetched concurrently with at most `per_host_limit` requests per
+    host at once. Bodies are capped at `max_bytes`. Extracted text is cached
+    by URL. An entry older than `fresh_seconds` is revalidated with
+    If-None-Match / If-Modified-Since, so an unchanged page costs a 304
+    instead of a download and re-parse. A `get_articles` batch returns
+    whatever finished within `batch_deadline_seconds`, and downloads still
+    streaming at that point are abandoned. Only public http(s) hosts are
+    fetched, including across redirects.
+    """
+
+    CACHE_PREFIX = "article:"
+
+    def __init__(
+        self,
+        cache: Optional[Cache] = None,
+        max_workers: int = 8,
+        per_host_limit: int = 2,
+        timeout: int = 5,
+        max_bytes: int = 2_000_000,
+        max_chars: int = 4000,
+        fresh_seconds: int = 3600,
+        cache_ttl_seconds: int = 86400,
+        batch_deadline_seconds: float = 10.0,
+    ) -> None:
+        """Initialize Article Service."""
+        self.cache = cache if cache is not None else MemoryCache()
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.fresh_seconds = fresh_seconds
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.batch_deadline_seconds = batch_deadline_seconds
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": "HNAgent/1.0"})
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="article-fetch"
+        )
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._slots_lock = threading.Lock()
+
+    def get_articles(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch several articles in one parallel batch, keyed by URL.
+
+        Pages not fetched by the batch deadline are left out.
+        """
+        deadline = time.monotonic() + self.batch_deadline_seconds
+        unique = list(dict.fromkeys(u for u in urls if u))
+        futures = {
+            url: self._pool.submit(self.get_article, url, deadline) for url in unique
+        }
+        _, pending = wait(futures.values(), timeout=self.batch_deadline_seconds)
+        for future in pending:
+            future.cancel()
+
+        articles: Dict[str, Dict[str, Any]] = {}
+        for url, future in futures.items():
+            if future in pending:
+                logger.warning(f"Article fetch missed the batch deadline: {url}")
+                continue
+            try:
+                article = future.result()
+            except Exception as e:
+                logger.warning(f"Article fetch failed for {url}: {e}")
+                continue
+            if article is not None:
+                articles[url] = article
+        return articles
+
+    def get_article(
+        self, url: str, deadline: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return {url, title, text, ...} for one page, or None on failure.
+
+        `deadline` is a time.monotonic() value; the download is abandoned once
+        it passes.
+        """
+        key = self.CACHE_PREFIX + url
+        cached = self.cache.get(key)
+        if cached and time.time() - cached["fetched_at"] < self.fresh_seconds:
+            return cached
+
+        article = self._download(url, cached, deadline)
+        if article is not None:
+            self.cache.set(key, article, ttl_seconds=self.cache_ttl_seconds)
+        return article
+
+    def _download(
+        self, url: str, cached: Optional[Dict[str, Any]], deadline: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        with self._get_public(url, headers) as response:
+            if response.status_code == 304 and cached:
+                return {**cached, "fetched_at": time.time()}
+            response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type", "")
+            if "html" not in content_type:
+                logger.info(f"Skipping non-HTML article ({content_type}): {url}")
+                return None
+
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                body.extend(chunk)
+                if len(body) >= self.max_bytes:
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"Deadline passed while reading {url}")
+
+        title, text = extract_main_text(
+            bytes(body[: self.max_bytes]), max_chars=self.max_chars
+        )
+        return {
+            "url": url,
+            "title": title,
+            "text": text,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+
+    @contextmanager
+    def _get_public(self, url: str, headers: Dict[str, str]) -> Iterator[requests.Response]:
+        """GET `url`, following redirects only to public http(s) hosts.
+
+        Every hop holds a slot of its own host, and the final response is
+        read while holding its host's slot, so a redirect cannot bypass the
+        per-host limit.
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            check_public_url(url)
+            with self._host_slot(urlparse(url).netloc):
+                response = self.session.get(
+                    url, headers=headers, timeout=self.timeout, stream=True,
+                    allow_redirects=False,
+                )
+                if not response.is_redirect:
+                    try:
+                        yield response
+                    finally:
+                        response.close()
+                    return
+                response.close()
+            url = urljoin(url, response.headers["Location"])
+        raise BlockedURLError(f"Too many redirects: {url}")
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+            return slot
@@ -0,0 +1,140 @@
+"""TTL caches for Hacker News API responses.
+
+Two backends share the same get/set interface:
+  - MemoryCache: a dict guarded by a lock, private to one process
+  - DiskCache: a SQLite file in WAL mode, shared by every worker on the host
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+from hn_agent.utils.serialization import dumps, loads
+
+
+class MemoryCache:
+    """In-process cache with per-entry expiry and a least-recently-used size cap.
+
+    Expired entries are dropped when read and swept every `PURGE_EVERY` writes,
+    so items that leave the front page do not pile up in a long-running server.
+    """
+
+    PURGE_EVERY = 500
+
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 10_000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        """Store a value for `ttl_seconds` (defaults to the cache TTL)."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (now + ttl, value)
+            self._entries.move_to_end(key)
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                expired = [k for k, (expires_at, _) in self._entries.items() if expires_at < now]
+                for k in expired:
+                    del self._entries[k]
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskCache:
+    """SQLite-backed cache shared across processes.
+
+    Values are stored as JSON (encoded with orjson when it is installed). Each
+    thread keeps its own connection, and WAL mode lets readers in other
+    workers proceed while the refresher writes.
+    """
+
+    PURGE_EVERY = 500
+
+    def __init__(self, path: Union[str, Path], ttl_seconds: int = 300) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return loads(row[0])
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        """Store a value for `ttl_seconds` (defaults to the cache TTL)."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, dumps(value), now + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+        conn.commit()
+
+
+Cache = Union[MemoryCache, DiskCache]
+
+
+def create_cache(
+    backend: str = "memory",
+    path: Union[str, Path] = ".cache/hn_cache.sqlite3",
+    ttl_seconds: int = 300,
+    max_entries: int = 10_000,
+) -> Cache:
+    """Build the cache backend named by the CACHE_BACKEND setting.
+
+    `max_entries` caps the memory backend; the disk backend is bounded by its
+    periodic purge of expired rows.
+    """
+    if backend == "memory":
+        return MemoryCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+    if backend == "disk":
+        return DiskCache(path, ttl_seconds=ttl_seconds)
+    raise ValueError(f"Unknown CACHE_BACKEND '{backend}'. Use 'memory' or 'disk'.")
@@ -1,43 +1,107 @@
 """Hacker News API service with concurrent fetching."""
+import time
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Optional
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
+from hn_agent.services.cache import Cache
+from hn_agent.services.scheduler import (
+    FetchScheduler,
+    Priority,
+    TokenBucket,
+    get_fetch_scheduler,
+    get_rate_limiter,
+)
 from hn_agent.utils.logger import logger
 
+if TYPE_CHECKING:
+    from hn_agent.services.snapshot import SnapshotReplay
+
 
 class HNService:
     """Service for fetching Hacker News data."""
 
     BASE_URL = "https://hacker-news.firebaseio.com/v0"
 
-    def __init__(self, max_retries: int = 2, timeout: int = 5) -> None:
-        """Initialize HN Service."""
+    # Extra ids fetched per round to absorb deleted, dead and job items.
+    FILL_MARGIN = 3
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        timeout: int = 5,
+        cache: Optional[Cache] = None,
+        read_cache: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+        scheduler: Optional[FetchScheduler] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        replay: Optional["SnapshotReplay"] = None,
+    ) -> None:
+        """Initialize HN Service.
+
+        With `read_cache=False` responses are still written to the cache but
+        never served from it, which is how the background refresher bypasses
+        entries it is about to replace. Item fetches run on the process-wide
+        scheduler at `priority`, and every HTTP attempt takes a token from the
+        shared rate limiter.
+
+        With a `replay`, every document is read from that snapshot instead of
+        the network or the cache (offline benchmarks and reprocessing).
+        """
         self.max_retries = max_retries
         self.timeout = timeout
+        self.cache = cache
+        self.read_cache = read_cache
+        self.priority = priority
+        self.scheduler = scheduler or get_fetch_scheduler()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.replay = replay
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": "HNAgent/1.0"})
 
-    def get_top_stories(self, count: int = 5) -> List[Dict[str, Any]]:
-        """Fetch top stories from HN concurrently."""
+    def get_top_stories(
+        self, count: int = 5, deadline_seconds: float = 10.0
+    ) -> List[Dict[str, Any]]:
+        """Fetch top stories from HN concurrently.
+
+        Items that are not live stories are skipped and replaced by the next
+        ids in the ranking, so up to `count` stories come back in one call.
+        `deadline_seconds` bounds the whole call, including the id-list fetch.
+        """
         logger.info(f"Fetching top {count} stories")
+        deadline = time.monotonic() + deadline_seconds
         try:
-            story_ids = self._fetch_with_retry(f"{self.BASE_URL}/topstories.json")
+            ids_future = self.scheduler.submit(self.get_top_story_ids, priority=self.priority)
+            try:
+                story_ids = ids_future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                ids_future.cancel()
+                logger.warning("Story fetch deadline hit while fetching the id list")
+                return []
             if not story_ids:
                 return []
 
-            stories = self._fetch_items_concurrent(story_ids[:count])
+            stories = self._fetch_stories_filled(story_ids, count, deadline)
             logger.info(f"Fetched {len(stories)} stories")
             return stories
         except Exception as e:
             logger.error(f"Error fetching top stories: {e}")
             return []
 
+    def get_top_story_ids(self) -> List[int]:
+        """Return the ids of the current top stories, in rank order."""
+        return self._fetch_json(f"{self.BASE_URL}/topstories.json") or []
+
+    def get_item(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """Return the raw API document of an item, or None if it does not exist."""
+        return self._fetch_json(f"{self.BASE_URL}/item/{item_id}.json")
+
     def get_comments(self, story_id: int, max_comments: int = 5) -> List[Dict[str, Any]]:
         """Fetch comments for a story concurrently."""
         logger.info(f"Fetching comments for story {story_id}")
         try:
-            story = self._fetch_with_retry(f"{self.BASE_URL}/item/{story_id}.json")
+            story = self.get_item(story_id)
             if not story or "kids" not in story:
                 return []
 
@@ -51,32 +115,151 @@ class HNService:
             logger.error(f"Error fetching comments: {e}")
             return []
 
-    def _fetch_items_concurrent(
-        self, item_ids: List[int], item_type: str = "story"
+    def get_comment_tree(
+        self, story_id: int, max_comments: int = 100, deadline_seconds: float = 10.0
+    ) -> List[Dict[str, Any]]:
+        """Fetch up to `max_comments` comments of a story, breadth-first.
+
+        Top-level comments come first, in HN's ranking order, then their
+        replies level by level. Each level is fetched as one concurrent batch.
+        The walk stops at `deadline_seconds` and returns what arrived by then.
+        """
+        logger.info(f"Fetching comment tree for story {story_id}")
+        deadline = time.monotonic() + deadline_seconds
+        try:
+            story = self.get_item(story_id)
+            frontier = list((story or {}).get("kids", []))
+            comments: List[Dict[str, Any]] = []
+            while frontier and len(comments) < max_comments:
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Comment tree deadline hit for story {story_id}")
+                    break
+                level = self._fetch_items_concurrent(
+                    frontier[:max_comments - len(comments)],
+                    item_type="comment",
+                    deadline=deadline,
+                )
+                comments.extend(level)
+                frontier = [kid for comment in level for kid in comment["kids"]]
+            logger.info(f"Fetched {len(comments)} comments")
+            return comments
+        except Exception as e:
+            logger.error(f"Error fetching comment tree: {e}")
+            return []
+
+    def prefetch(
+        self,
+        story_count: int = 10,
+        thread_count: int = 5,
+        max_comments: int = 5,
+        comment_pool_size: int = 0,
+        deadline_seconds: float = 60.0,
+    ) -> int:
+        """Fetch top stories and the first comment page of the leading threads.
+
+        Used to warm the cache: the stories and all of their first
+        `max_comments` comments are fetched as one concurrent batch. With a
+        `comment_pool_size` larger than that, the leading threads' comment
+        trees are walked up to that size instead, which is the pool
+        extract_comment_insights clusters. Returns the number of items fetched.
+        """
+        stories = self.get_top_stories(count=story_count)
+        if comment_pool_size > max_comments:
+            trees = [
+                self.get_comment_tree(story["id"], comment_pool_size, deadline_seconds)
+                for story in stories[:thread_count]
+            ]
+            return len(stories) + sum(len(tree) for tree in trees)
+
+        comment_ids = [
+            cid for story in stories[:thread_count] for cid in story["kids"][:max_comments]
+        ]
+        comments = self._fetch_items_concurrent(comment_ids, item_type="comment")
+        return len(stories) + len(comments)
+
+    def _fetch_stories_filled(
+        self, story_ids: List[int], count: int, deadline: float
     ) -> List[Dict[str, Any]]:
-        """Fetch multiple items in parallel."""
-        results: List[Optional[Dict[str, Any]]] = [None] * len(item_ids)
+        """Collect `count` valid stories in rank order, refilling from later ids.
 
-        with ThreadPoolExecutor(max_workers=min(len(item_ids), 10)) as pool:
-            future_to_idx = {
-                pool.submit(self._fetch_item, iid, item_type): idx
-                for idx, iid in enumerate(item_ids)
+        Each round requests the remaining shortfall plus FILL_MARGIN ids. The
+        whole fill shares one `deadline` (a time.monotonic() value); whatever
+        arrived by then is returned.
+        """
+        found: Dict[int, Dict[str, Any]] = {}
+        next_rank = 0
+
+        while len(found) < count and next_rank < len(story_ids):
+            batch_size = count - len(found) + self.FILL_MARGIN
+            batch = story_ids[next_rank:next_rank + batch_size]
+            future_to_rank = {
+                self.scheduler.submit(
+                    self._fetch_item, iid, priority=self.priority
+                ): next_rank + offset
+                for offset, iid in enumerate(batch)
             }
-            for future in as_completed(future_to_idx):
-                idx = future_to_idx[future]
+            next_rank += len(batch)
+
+            done, pending = wait(
+                future_to_rank, timeout=max(deadline - time.monotonic(), 0)
+            )
+            for future in done:
                 try:
-                    results[idx] = future.result()
+                    story = future.result()
                 except Exception:
-                    pass
+                    continue
+                if story is not None:
+                    found[future_to_rank[future]] = story
+
+            if pending:
+                for future in pending:
+                    future.cancel()
+                logger.warning(
+                    f"Story fetch deadline hit with {len(pending)} items pending"
+                )
+                break
+
+        return [found[rank] for rank in sorted(found)][:count]
 
-        return [r for r in results if r is not None]
+    def _fetch_items_concurrent(
+        self,
+        item_ids: List[int],
+        item_type: str = "story",
+        deadline: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch multiple items in parallel on the shared scheduler.
+
+        With a `deadline` (a time.monotonic() value), items not fetched by then
+        are cancelled and left out.
+        """
+        futures = [
+            self.scheduler.submit(self._fetch_item, iid, item_type, priority=self.priority)
+            for iid in item_ids
+        ]
+        pending = set()
+        if deadline is not None:
+            _, pending = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+            for future in pending:
+                future.cancel()
+
+        results: List[Dict[str, Any]] = []
+        for future in futures:
+            if future in pending:
+                continue
+            try:
+                item = future.result()
+            except Exception:
+                continue
+            if item is not None:
+                results.append(item)
+        return results
 
     def _fetch_item(
         self, item_id: int, item_type: str = "story"
     ) -> Optional[Dict[str, Any]]:
         """Fetch a single item (story or comment)."""
-        data = self._fetch_with_retry(f"{self.BASE_URL}/item/{item_id}.json")
-        if not data:
+        data = self.get_item(item_id)
+        if not data or data.get("deleted") or data.get("dead"):
             return None
 
         if item_type == "comment":
@@ -88,8 +271,13 @@ class HNService:
                 "by": data.get("by"),
                 "time": data.get("time"),
                 "score": data.get("score", 0),
+                "parent": data.get("parent"),
+                "kids": data.get("kids", []),
             }
 
+        if data.get("type") != "story":
+            return None
+
         return {
             "id": data.get("id"),
             "title": data.get("title"),
@@ -101,11 +289,25 @@ class HNService:
             "kids": data.get("kids", []),
         }
 
+    def _fetch_json(self, url: str) -> Optional[Any]:
+        """Fetch a JSON document, going through the cache when one is set."""
+        if self.replay is not None:
+            return self.replay.get(url[len(self.BASE_URL) + 1:])
+
+        if self.cache is not None and self.read_cache:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached
+
+        data = self._fetch_with_retry(url)
+        if data is not None and self.cache is not None:
+            self.cache.set(url, data)
+        return data
+
     def _fetch_with_retry(self, url: str) -> Optional[Any]:
         """Fetch with retry logic."""
-        import time
-
         for attempt in range(self.max_retries):
+            self.rate_limiter.acquire()
             try:
                 response = self.session.get(url, timeout=self.timeout)
                 response.raise_for_status()
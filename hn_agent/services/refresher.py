@@ -0,0 +1,144 @@
+"""Background cache refresh with single-leader election.
+
+Every worker process starts a CacheRefresher, but only the one holding the
+LeaderLock talks to the HN API. The others serve from the shared cache. If the
+leader exits, the OS releases its lock and another worker takes over on its
+next tick.
+"""
+import fcntl
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from hn_agent.services.cache import Cache
+from hn_agent.services.hn_service import HNService
+from hn_agent.services.scheduler import Priority
+from hn_agent.utils.logger import logger
+
+
+class LeaderLock:
+    """Non-blocking inter-process lock backed by flock().
+
+    With no path the lock is process-local and always granted, which is what
+    a single-worker server with an in-memory cache wants.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.path is None or self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Take the lock if free. Returns True while this process holds it."""
+        if self.is_leader:
+            return True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        logger.info(f"Process {os.getpid()} elected cache refresher")
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class CacheRefresher:
+    """Pre-fetches top stories and their first comment pages on a schedule.
+
+    With `comment_pool_size`, the leading threads' comment trees are fetched
+    up to that size, so extract_comment_insights is served from the cache.
+
+    Call `warm_up()` once before serving so the first user never waits on a
+    cold fetch, then `start()` to refresh every `interval_seconds`. Keep the
+    interval below the cache TTL so hot entries never expire between runs.
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        lock: LeaderLock,
+        interval_seconds: int = 120,
+        story_count: int = 10,
+        thread_count: int = 5,
+        comment_count: int = 5,
+        comment_pool_size: int = 0,
+    ) -> None:
+        self.service = HNService(
+            cache=cache, read_cache=False, priority=Priority.BACKGROUND
+        )
+        self.lock = lock
+        self.interval_seconds = interval_seconds
+        self.story_count = story_count
+        self.thread_count = thread_count
+        self.comment_count = comment_count
+        self.comment_pool_size = comment_pool_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the refresh loop in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="hn-cache-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.lock.release()
+
+    def warm_up(self) -> None:
+        """Fill the cache synchronously if this process is the refresher.
+
+        Only first comment pages are fetched here, to keep startup fast; the
+        refresh loop fills the larger comment pools as soon as it starts.
+        """
+        if not self.lock.try_acquire():
+            logger.info("Skipping cache warm-up: another worker is the refresher")
+            return
+        start = time.perf_counter()
+        self.refresh_once(include_pools=False)
+        logger.info(f"Cache warm-up finished in {time.perf_counter() - start:.2f}s")
+
+    def refresh_once(self, include_pools: bool = True) -> None:
+        """Re-fetch stories and comment pages, bypassing cached copies."""
+        fetched = self.service.prefetch(
+            story_count=self.story_count,
+            thread_count=self.thread_count,
+            max_comments=self.comment_count,
+            comment_pool_size=self.comment_pool_size if include_pools else 0,
+        )
+        logger.info(
+            f"Cache refresher stored {fetched} items "
+            f"(fetch queues: {self.service.scheduler.stats()})"
+        )
+
+    def _run(self) -> None:
+        # Fill the comment pools skipped by warm_up right away, then every interval
+        delay = 0 if self.comment_pool_size else self.interval_seconds
+        while not self._stop.wait(delay):
+            delay = self.interval_seconds
+            if self.lock.try_acquire():
+                try:
+                    self.refresh_once()
+                except Exception as e:
+                    logger.error(f"Cache refresh failed: {e}")
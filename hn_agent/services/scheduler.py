@@ -0,0 +1,161 @@
+"""Process-wide scheduling and rate limiting for upstream HN requests.
+
+All HNService instances in a process share one FetchScheduler (a fixed pool of
+worker threads fed by a priority queue) and one TokenBucket that every HTTP
+attempt draws from. Interactive fetches are always dequeued ahead of
+background pre-fetch work, and background work is shed once its queue is
+full. Total outbound load therefore stays bounded however many sessions are
+active.
+"""
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Priority(IntEnum):
+    """Scheduling priority. Lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class SchedulerBusyError(RuntimeError):
+    """Raised through a future when background work is shed."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket. A rate of 0 or less disables limiting."""
+
+    def __init__(self, rate_per_second: float = 20.0, burst: int = 40) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        if self.rate_per_second <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate_per_second,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate_per_second
+            time.sleep(wait)
+
+
+class FetchScheduler:
+    """Fixed worker pool that runs queued calls in priority order."""
+
+    def __init__(self, max_workers: int = 16, background_queue_limit: int = 200) -> None:
+        self.max_workers = max_workers
+        self.background_queue_limit = background_queue_limit
+        self._queue: "queue.PriorityQueue[tuple]" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._depths: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._running = 0
+        self._shed = 0
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+
+    def submit(
+        self, fn: Callable[..., Any], *args: Any, priority: Priority = Priority.INTERACTIVE
+    ) -> Future:
+        """Queue `fn(*args)` and return a Future for its result."""
+        future: Future = Future()
+        with self._lock:
+            if (
+                priority == Priority.BACKGROUND
+                and self._depths[priority] >= self.background_queue_limit
+            ):
+                self._shed += 1
+                future.set_exception(
+                    SchedulerBusyError("Background fetch queue is full")
+                )
+                return future
+            self._depths[priority] += 1
+            self._start_workers()
+        self._queue.put((priority, next(self._sequence), future, fn, args))
+        return future
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth per priority, plus running and shed task counts."""
+        with self._lock:
+            stats = {f"queued_{p.name.lower()}": n for p, n in self._depths.items()}
+            stats["running"] = self._running
+            stats["shed_background"] = self._shed
+        return stats
+
+    def _start_workers(self) -> None:
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._work, name=f"hn-fetch-{len(self._workers)}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self) -> None:
+        while True:
+            priority, _, future, fn, args = self._queue.get()
+            with self._lock:
+                self._depths[priority] -= 1
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            with self._lock:
+                self._running += 1
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+
+_scheduler: Optional[FetchScheduler] = None
+_rate_limiter: Optional[TokenBucket] = None
+_config_lock = threading.Lock()
+
+
+def configure_fetch_limits(
+    max_concurrency: int = 16,
+    rate_per_second: float = 20.0,
+    burst: int = 40,
+    background_queue_limit: int = 200,
+) -> None:
+    """Set the process-wide limits. Call once at startup, before any fetch."""
+    global _scheduler, _rate_limiter
+    with _config_lock:
+        _scheduler = FetchScheduler(max_concurrency, background_queue_limit)
+        _rate_limiter = TokenBucket(rate_per_second, burst)
+
+
+def get_fetch_scheduler() -> FetchScheduler:
+    """Return the shared scheduler, creating it with defaults if needed."""
+    global _scheduler
+    with _config_lock:
+        if _scheduler is None:
+            _scheduler = FetchScheduler()
+        return _scheduler
+
+
+def get_rate_limiter() -> TokenBucket:
+    """Return the shared token bucket, creating it with defaults if needed."""
+    global _rate_limiter
+    with _config_lock:
+        if _rate_limiter is None:
+            _rate_limiter = TokenBucket()
+        return _rate_limiter
@@ -0,0 +1,327 @@
+"""HN snapshots on disk: export, streaming reads and offline replay.
+
+A snapshot is a directory of append-only files partitioned by UTC hour:
+
+    <root>/date=2026-10-19/hour=14/part-<millis>-<pid>-<n>.jsonl.gz   (or .parquet)
+
+Every record is one raw API document, {"path", "fetched_at", "data"}, where
+`path` is the URL relative to HNService.BASE_URL ("topstories.json",
+"item/123.json"). That is what lets SnapshotReplay answer HNService requests
+without the network. Parquet parts also spread the common item fields over
+typed columns (ITEM_COLUMNS), so analysis queries can prune columns and use
+row-group statistics instead of parsing `data`. Parts are written under a
+".tmp" name and renamed when closed, so readers never see a half-written file.
+"""
+import gzip
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from hn_agent.services.hn_service import HNService
+from hn_agent.utils.logger import logger
+from hn_agent.utils.serialization import dumps, loads
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for the parquet format
+    pa = None
+    pq = None
+
+SNAPSHOT_FORMATS = ("jsonl", "parquet")
+
+_EXTENSIONS = {"jsonl": ".jsonl.gz", "parquet": ".parquet"}
+
+TOP_STORIES_PATH = "topstories.json"
+
+# Item fields stored as typed parquet columns next to the raw `data` JSON.
+# They are null for documents that are not items (the top-stories list).
+ITEM_COLUMNS = (
+    ("id", "int64"),
+    ("type", "string"),
+    ("by", "string"),
+    ("time", "int64"),
+    ("score", "int64"),
+    ("parent", "int64"),
+    ("title", "string"),
+    ("url", "string"),
+    ("descendants", "int64"),
+)
+
+_RECORD_COLUMNS = ["path", "fetched_at", "data"]
+
+
+def item_path(item_id: int) -> str:
+    """Snapshot path of an item document."""
+    return f"item/{item_id}.json"
+
+
+def partition_dir(root: Union[str, Path], timestamp: float) -> Path:
+    """Hourly partition directory that holds records fetched at `timestamp`."""
+    moment = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    return Path(root) / f"date={moment:%Y-%m-%d}" / f"hour={moment:%H}"
+
+
+def partition_time(partition: Path) -> datetime:
+    """Start of the UTC hour a partition directory covers."""
+    date = partition.parent.name.split("=", 1)[1]
+    hour = partition.name.split("=", 1)[1]
+    return datetime.strptime(f"{date} {hour}", "%Y-%m-%d %H").replace(tzinfo=timezone.utc)
+
+
+def list_partitions(
+    root: Union[str, Path],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Path]:
+    """Partition directories in time order, optionally within [start, end]."""
+    partitions = sorted(Path(root).glob("date=*/hour=*"))
+    return [
+        p for p in partitions
+        if (start is None or partition_time(p) >= start)
+        and (end is None or partition_time(p) <= end)
+    ]
+
+
+def iter_records(partition: Path, batch_size: int = 10_000) -> Iterator[Dict[str, Any]]:
+    """Stream the records of one partition, one part file at a time."""
+    for part in sorted(partition.glob("part-*")):
+        if part.name.endswith(_EXTENSIONS["jsonl"]):
+            with gzip.open(part, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield loads(line)
+        elif part.name.endswith(_EXTENSIONS["parquet"]):
+            if pq is None:
+                raise ImportError("pyarrow is required to read parquet snapshots")
+            batches = pq.ParquetFile(part).iter_batches(
+                batch_size=batch_size, columns=_RECORD_COLUMNS
+            )
+            for batch in batches:
+                for row in batch.to_pylist():
+                    row["data"] = loads(row["data"])
+                    yield row
+
+
+def iter_snapshot(
+    root: Union[str, Path],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream every record under `root` in partition order.
+
+    Memory use is bounded by one parquet batch, whatever the snapshot size, so
+    bulk reprocessing and backfills can run over months of data.
+    """
+    for partition in list_partitions(root, start, end):
+        yield from iter_records(partition)
+
+
+class SnapshotWriter:
+    """Appends raw HN documents to hourly partitions.
+
+    A part file is closed when the hour rolls over or after
+    `max_rows_per_part` records. Parquet rows are buffered into row groups of
+    `row_group_size`. Safe to share between fetch threads.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        fmt: str = "jsonl",
+        max_rows_per_part: int = 100_000,
+        row_group_size: int = 5_000,
+    ) -> None:
+        if fmt not in SNAPSHOT_FORMATS:
+            raise ValueError(
+                f"Unknown snapshot format: {fmt!r} (expected one of {SNAPSHOT_FORMATS})"
+            )
+        if fmt == "parquet" and pq is None:
+            raise ImportError("pyarrow is required for parquet snapshots")
+        self.root = Path(root)
+        self.fmt = fmt
+        self.max_rows_per_part = max_rows_per_part
+        self.row_group_size = row_group_size
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._partition: Optional[Path] = None
+        self._path: Optional[Path] = None
+        self._file: Any = None
+        self._rows = 0
+        self._buffer: List[Dict[str, Any]] = []
+
+    def write(self, path: str, data: Any, fetched_at: Optional[float] = None) -> None:
+        """Append one document fetched from `path` (relative to the API root)."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        partition = partition_dir(self.root, fetched_at)
+        with self._lock:
+            if partition != self._partition or self._rows >= self.max_rows_per_part:
+                self._close_part()
+                self._open_part(partition)
+
+            if self.fmt == "jsonl":
+                record = {"path": path, "fetched_at": fetched_at, "data": data}
+                self._file.write(dumps(record) + "\n")
+            else:
+                item = data if isinstance(data, dict) else {}
+                row = {name: item.get(name) for name, _ in ITEM_COLUMNS}
+                row.update(path=path, fetched_at=fetched_at, data=dumps(data))
+                self._buffer.append(row)
+                if len(self._buffer) >= self.row_group_size:
+                    self._flush_row_group()
+            self._rows += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_part()
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _open_part(self, partition: Path) -> None:
+        partition.mkdir(parents=True, exist_ok=True)
+        name = (
+            f"part-{int(time.time() * 1000)}-{os.getpid()}-{next(self._sequence)}"
+            f"{_EXTENSIONS[self.fmt]}"
+        )
+        self._partition = partition
+        self._path = partition / name
+        tmp_path = self._tmp_path(self._path)
+        if self.fmt == "jsonl":
+            self._file = gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6)
+        else:
+            schema = pa.schema(
+                [("path", pa.string()), ("fetched_at", pa.float64())]
+                + [(name, getattr(pa, kind)()) for name, kind in ITEM_COLUMNS]
+                + [("data", pa.string())]
+            )
+            self._file = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+        self._rows = 0
+
+    def _flush_row_group(self) -> None:
+        if self._buffer:
+            self._file.write_table(pa.Table.from_pylist(self._buffer, self._file.schema))
+            self._buffer = []
+
+    def _close_part(self) -> None:
+        if self._file is None:
+            return
+        if self.fmt == "parquet":
+            self._flush_row_group()
+        self._file.close()
+        self._tmp_path(self._path).rename(self._path)
+        logger.info(f"Snapshot part written: {self._path} ({self._rows} records)")
+        self._file = None
+        self._path = None
+
+    @staticmethod
+    def _tmp_path(path: Path) -> Path:
+        return path.with_name(path.name + ".tmp")
+
+
+class SnapshotReplay:
+    """Serves HNService requests from one snapshot partition instead of the network.
+
+    Only the chosen hour is loaded, so memory is bounded by one partition.
+    When a document was captured more than once in that hour, the last copy
+    wins. Documents missing from the snapshot read as None, like a 404.
+    """
+
+    def __init__(self, partition: Path) -> None:
+        self.partition = Path(partition)
+        self._documents: Dict[str, Any] = {
+            record["path"]: record["data"] for record in iter_records(self.partition)
+        }
+        logger.info(f"Replaying {len(self._documents)} documents from {self.partition}")
+
+    @classmethod
+    def latest(
+        cls, root: Union[str, Path], at: Optional[datetime] = None
+    ) -> "SnapshotReplay":
+        """Replay the newest partition at or before `at` (default: the newest)."""
+        partitions = list_partitions(root, end=at)
+        if not partitions:
+            raise FileNotFoundError(f"No snapshot partitions under {root}")
+        return cls(partitions[-1])
+
+    def get(self, path: str) -> Optional[Any]:
+        return self._documents.get(path)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+class SnapshotExporter:
+    """Streams the top stories and their full comment trees into a SnapshotWriter.
+
+    Trees are walked breadth-first, one level at a time, in batches of
+    `batch_size` ids on the shared fetch scheduler. Each document is written
+    as soon as it arrives, so memory holds only the current batch and the ids
+    of the next level.
+    """
+
+    def __init__(
+        self, hn_service: HNService, writer: SnapshotWriter, batch_size: int = 100
+    ) -> None:
+        self.hn_service = hn_service
+        self.writer = writer
+        self.batch_size = batch_size
+
+    def export(self, story_count: int = 30, max_depth: Optional[int] = None) -> int:
+        """Export `story_count` top stories with their comments. Returns records written.
+
+        `max_depth` limits comment nesting (0 exports the stories only). Every
+        record of a run is stamped with the run's start time, so a run that
+        crosses an hour boundary still lands in one partition and replays as
+        a whole.
+        """
+        run_started = time.time()
+        story_ids = self.hn_service.get_top_story_ids()
+        if not story_ids:
+            return 0
+        self.writer.write(TOP_STORIES_PATH, story_ids, fetched_at=run_started)
+        written = 1
+
+        frontier = story_ids[:story_count]
+        depth = 0
+        while frontier:
+            next_frontier: List[int] = []
+            for start in range(0, len(frontier), self.batch_size):
+                batch = frontier[start:start + self.batch_size]
+                for item_id, item in self._fetch_batch(batch):
+                    self.writer.write(item_path(item_id), item, fetched_at=run_started)
+                    written += 1
+                    if max_depth is None or depth < max_depth:
+                        next_frontier.extend(item.get("kids", []))
+            frontier = next_frontier
+            depth += 1
+
+        logger.info(f"Snapshot export wrote {written} records")
+        return written
+
+    def _fetch_batch(self, item_ids: List[int]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        futures: List[Tuple[int, Future]] = [
+            (
+                iid,
+                self.hn_service.scheduler.submit(
+                    self.hn_service.get_item, iid, priority=self.hn_service.priority
+                ),
+            )
+            for iid in item_ids
+        ]
+        for item_id, future in futures:
+            try:
+                item = future.result()
+            except Exception as e:
+                logger.warning(f"Snapshot fetch failed for item {item_id}: {e}")
+                continue
+            if item is not None:
+                yield item_id, item
@@ -0,0 +1,45 @@
+"""Structured tool outputs.
+
+Tools return Records (a list of dicts), so the agent's generated code can read
+fields directly (`stories[0]["id"]`) instead of regex-parsing text. Printing
+a Records value gives a compact pipe table, which is what ends up in the
+model's observation.
+"""
+from typing import Any, Dict, Iterable, Sequence
+
+
+class Records(list):
+    """List of dicts that renders as a compact table."""
+
+    def __init__(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        columns: Sequence[str],
+        max_cell_chars: int = 80,
+        footer: str = "",
+    ) -> None:
+        super().__init__(rows)
+        self.columns = tuple(columns)
+        self.max_cell_chars = max_cell_chars
+        self.footer = footer
+
+    def to_table(self) -> str:
+        """Render as `col | col | ...` lines: one header row, one row per record."""
+        lines = [" | ".join(self.columns)]
+        for row in self:
+            lines.append(" | ".join(self._cell(row.get(col)) for col in self.columns))
+        if self.footer:
+            lines.append(self.footer)
+        return "\n".join(lines)
+
+    def _cell(self, value: Any) -> str:
+        text = "" if value is None else str(value)
+        text = " ".join(text.split()).replace("|", "/")
+        if len(text) > self.max_cell_chars:
+            text = text[: self.max_cell_chars - 3] + "..."
+        return text
+
+    def __str__(self) -> str:
+        return self.to_table()
+
+    __repr__ = __str__
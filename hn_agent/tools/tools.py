@@ -1,9 +1,40 @@
 """Custom tools for HN Agent using smolagents Tool interface."""
+from typing import TYPE_CHECKING, List, Optional, Union
+
 from smolagents import Tool
 
+from hn_agent.core.digest import DigestBuilder
+from hn_agent.core.prompts import truncate_text
+from hn_agent.services.article_service import ArticleService
 from hn_agent.services.hn_service import HNService
+from hn_agent.tools.records import Records
 from hn_agent.utils.logger import logger
 
+if TYPE_CHECKING:
+    from hn_agent.core.clustering import CommentCluster
+
+# "records": Records objects (list of dicts, prints as a compact table).
+# "text": the original multi-line text blocks.
+OUTPUT_FORMATS = ("records", "text")
+
+STORY_COLUMNS = ("id", "title", "score", "comments", "ratio", "url", "by")
+COMMENT_COLUMNS = ("cluster", "id", "by", "text")
+
+
+def _message(output_format: str, columns, text: str) -> Union[Records, str]:
+    """An empty or error result; in records mode still a list, with `text` as its footer."""
+    if output_format == "records":
+        return Records([], columns, footer=text)
+    return text
+
+
+def _check_output_format(output_format: str) -> str:
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output_format '{output_format}'. Use 'records' or 'text'."
+        )
+    return output_format
+
 
 class FetchTopStoriesToolTool(Tool):
     """Tool to fetch top stories from Hacker News."""
@@ -11,7 +42,10 @@ class FetchTopStoriesToolTool(Tool):
     name = "fetch_top_stories"
     description = (
         "Fetches the top N trending stories from Hacker News. "
-        "Returns story ID, title, score, comment count, URL, and engagement metrics."
+        "Returns a list of story dicts with keys "
+        f"{', '.join(STORY_COLUMNS)} (`id` is the numeric Story ID, `ratio` is "
+        "score per comment). Read fields directly, e.g. stories[0]['id']; "
+        "printing the list shows a compact table."
     )
     inputs = {
         "num_stories": {
@@ -20,20 +54,52 @@ class FetchTopStoriesToolTool(Tool):
             "nullable": True,
         }
     }
-    output_type = "string"
+    output_type = "object"
 
-    def __init__(self) -> None:
+    TEXT_DESCRIPTION = (
+        "Fetches the top N trending stories from Hacker News. "
+        "Returns story ID, title, score, comment count, URL, and engagement metrics."
+    )
+
+    def __init__(
+        self, hn_service: Optional[HNService] = None, output_format: str = "records"
+    ) -> None:
         super().__init__()
-        self.hn_service = HNService()
+        self.hn_service = hn_service or HNService()
+        self.output_format = _check_output_format(output_format)
+        if self.output_format == "text":
+            self.description = self.TEXT_DESCRIPTION
 
-    def forward(self, num_stories: int = 5) -> str:
+    def forward(self, num_stories: int = 5) -> Union[Records, str]:
         num_stories = max(1, min(num_stories or 5, 10))
         logger.info(f"Tool: Fetching {num_stories} top stories")
 
         try:
             stories = self.hn_service.get_top_stories(count=num_stories)
             if not stories:
-                return "No stories found on Hacker News right now."
+                return _message(
+                    self.output_format, STORY_COLUMNS,
+                    "No stories found on Hacker News right now.",
+                )
+
+            if self.output_format == "records":
+                return Records(
+                    (
+                        {
+                            "id": story.get("id"),
+                            "title": story.get("title"),
+                            "score": story.get("score", 0),
+                            "comments": story.get("descendants", 0),
+                            "ratio": round(
+                                story.get("score", 0) / max(story.get("descendants", 0), 1), 1
+                            ),
+                            "url": story.get("url"),
+                            "by": story.get("by"),
+                        }
+                        for story in stories
+                    ),
+                    STORY_COLUMNS,
+                )
 
             result = []
             for i, story in enumerate(stories, 1):
@@ -53,80 +119,226 @@ class FetchTopStoriesToolTool(Tool):
             return "\n".join(result)
         except Exception as e:
             logger.error(f"Error in fetch_top_stories: {e}")
-            return f"Error fetching stories: {e}"
+            return _message(self.output_format, STORY_COLUMNS, f"Error fetching stories: {e}")
+
+
+class FetchStoryArticlesTool(Tool):
+    """Tool to fetch the articles linked from the top stories."""
+
+    name = "fetch_story_articles"
+    description = (
+        "Fetches the linked articles of the top N Hacker News stories in one batch "
+        "and returns the main text of each, so you can explain what a story is about."
+    )
+    inputs = {
+        "num_stories": {
+            "type": "integer",
+            "description": "Number of top stories whose articles to fetch (1-10). Default is 5.",
+            "nullable": True,
+        }
+    }
+    output_type = "string"
+
+    EXCERPT_CHARS = 1500
+
+    def __init__(
+        self,
+        hn_service: Optional[HNService] = None,
+        article_service: Optional[ArticleService] = None,
+    ) -> None:
+        super().__init__()
+        self.hn_service = hn_service or HNService()
+        self.article_service = article_service or ArticleService()
+
+    def forward(self, num_stories: int = 5) -> str:
+        num_stories = max(1, min(num_stories or 5, 10))
+        logger.info(f"Tool: Fetching articles for {num_stories} top stories")
+
+        try:
+            stories = self.hn_service.get_top_stories(count=num_stories)
+            if not stories:
+                return "No stories found on Hacker News right now."
+
+            articles = self.article_service.get_articles(
+                [s.get("url") for s in stories]
+            )
+
+            result = []
+            for i, story in enumerate(stories, 1):
+                url = story.get("url")
+                article = articles.get(url) if url else None
+                if not url:
+                    body = "(Text post on Hacker News, no linked article.)"
+                elif article is None or not article["text"]:
+                    body = "(Article could not be fetched.)"
+                else:
+                    body = truncate_text(article["text"], self.EXCERPT_CHARS)
+
+                result.append(
+                    f"#{i}\n"
+                    f"Story ID: {story.get('id')}\n"
+                    f"Title: {story.get('title', 'N/A')}\n"
+                    f"URL: {url or 'N/A'}\n"
+                    f"Article:\n{body}\n"
+                )
+
+            return "\n".join(result)
+        except Exception as e:
+            logger.error(f"Error in fetch_story_articles: {e}")
+            return f"Error fetching articles: {e}"
+
+
+class SummarizeTopThreadsTool(Tool):
+    """Tool to build a digest of the top threads with parallel summarization."""
+
+    name = "summarize_top_threads"
+    description = (
+        "Summarizes the top N Hacker News stories together with their discussions. "
+        "Each thread is summarized in parallel; returns a finished markdown digest."
+    )
+    inputs = {
+        "num_stories": {
+            "type": "integer",
+            "description": "Number of top stories to summarize (1-10). Default is 5.",
+            "nullable": True,
+        }
+    }
+    output_type = "string"
+
+    def __init__(self, digest_builder: DigestBuilder) -> None:
+        super().__init__()
+        self.digest_builder = digest_builder
+
+    def forward(self, num_stories: int = 5) -> str:
+        num_stories = max(1, min(num_stories or 5, 10))
+        logger.info(f"Tool: Summarizing top {num_stories} threads")
+
+        try:
+            return self.digest_builder.build(count=num_stories)
+        except Exception as e:
+            logger.error(f"Error in summarize_top_threads: {e}")
+            return f"Error summarizing threads: {e}"
 
 
 class ExtractCommentInsightsTool(Tool):
-    """Tool to extract and summarize key insights from comments."""
+    """Tool to extract and summarize key insights from comments.
+
+    Fetches up to `comment_pool_size` comments of the thread and clusters
+    them locally (TF-IDF + k-means). Only the comments that best represent
+    each cluster are returned, so a large discussion costs the model about
+    `max_comments` comments instead of hundreds.
+    """
 
     name = "extract_comment_insights"
     description = (
-        "Extracts top comments and discussion themes from a Hacker News story. "
-        "Requires the numeric Story ID (integer) from fetch_top_stories output."
+        "Extracts the main discussion threads of a Hacker News story. "
+        "Requires the numeric Story ID (integer) from fetch_top_stories output. "
+        "Comments are grouped into topic clusters; returns the most representative "
+        f"comments as a list of dicts with keys {', '.join(COMMENT_COLUMNS)}. "
+        "Printing it shows a compact table followed by each cluster's size and key terms."
     )
     inputs = {
         "story_id": {
             "type": "integer",
-            "description": "Numeric Hacker News story ID (e.g. 42415051). Get this from the 'Story ID' field in fetch_top_stories output.",
+            "description": "Numeric Hacker News story ID (e.g. 42415051). Get this from the `id` field (Story ID) in fetch_top_stories output.",
         },
         "max_comments": {
             "type": "integer",
-            "description": "Maximum number of top comments to analyze (default: 5)",
+            "description": "Number of representative comments to return (default: 20)",
             "nullable": True,
         },
     }
-    output_type = "string"
+    output_type = "object"
 
-    def __init__(self) -> None:
+    TEXT_DESCRIPTION = (
+        "Extracts the main discussion threads of a Hacker News story. "
+        "Requires the numeric Story ID (integer) from fetch_top_stories output. "
+        "Returns representative comments grouped by topic cluster."
+    )
+
+    def __init__(
+        self,
+        hn_service: Optional[HNService] = None,
+        output_format: str = "records",
+        comment_pool_size: int = 100,
+    ) -> None:
         super().__init__()
-        self.hn_service = HNService()
+        self.hn_service = hn_service or HNService()
+        self.output_format = _check_output_format(output_format)
+        self.comment_pool_size = comment_pool_size
+        if self.output_format == "text":
+            self.description = self.TEXT_DESCRIPTION
 
-    def forward(self, story_id: int, max_comments: int = 5) -> str:
+    def forward(self, story_id: int, max_comments: int = 20) -> Union[Records, str]:
         # Validate story_id is a real HN item ID
         if not isinstance(story_id, int) or story_id < 1:
-            return (
+            return _message(
+                self.output_format,
+                COMMENT_COLUMNS,
                 f"Invalid story_id: {story_id}. "
                 "Please pass the numeric Story ID from fetch_top_stories output "
-                "(e.g. 42415051), not a URL or index number."
+                "(e.g. 42415051), not a URL or index number.",
             )
 
-        max_comments = max(1, min(max_comments or 5, 20))
+        max_comments = max(1, min(max_comments or 20, 30))
         logger.info(f"Tool: Extracting insights from story {story_id}")
 
         try:
-            comments = self.hn_service.get_comments(story_id, max_comments)
+            comments = self.hn_service.get_comment_tree(story_id, self.comment_pool_size)
             if not comments:
-                return f"No comments found for story {story_id}."
-
-            insights = []
-            for i, comment in enumerate(comments, 1):
-                text = comment.get("text", "")
-                text = text[:300] + "..." if len(text) > 300 else text
-                author = comment.get("by", "anonymous")
-                insights.append(f"Comment {i} (by {author}):\n{text}\n")
-
-            result = f"Top {len(comments)} comments for story {story_id}:\n\n"
-            result += "\n".join(insights)
-            result += "\n\nKey Themes: " + self._extract_themes(comments)
+                return _message(
+                    self.output_format, COMMENT_COLUMNS, f"No comments found for story {story_id}."
+                )
+
+            # numpy/scipy load on the first call, not on every cold start
+            from hn_agent.core.clustering import cluster_comments
+
+            clusters = cluster_comments(
+                [c.get("text", "") for c in comments], representatives=max_comments
+            )
+            themes = self._format_themes(clusters)
+
+            if self.output_format == "records":
+                return Records(
+                    (
+                        {
+                            "cluster": n,
+                            "id": comments[i].get("id"),
+                            "by": comments[i].get("by", "anonymous"),
+                            "text": comments[i].get("text", ""),
+                        }
+                        for n, cluster in enumerate(clusters, 1)
+                        for i in cluster.representatives
+                    ),
+                    COMMENT_COLUMNS,
+                    max_cell_chars=300,
+                    footer=themes,
+                )
+
+            shown = sum(len(cluster.representatives) for cluster in clusters)
+            result = (
+                f"{shown} representative comments out of {len(comments)} "
+                f"for story {story_id}:\n\n"
+            )
+            for n, cluster in enumerate(clusters, 1):
+                result += f"Cluster {n} ({cluster.size} comments):\n"
+                for i in cluster.representatives:
+                    text = comments[i].get("text", "")
+                    text = text[:300] + "..." if len(text) > 300 else text
+                    author = comments[i].get("by", "anonymous")
+                    result += f"Comment (by {author}):\n{text}\n\n"
+            result += themes
             return result
         except Exception as e:
             logger.error(f"Error in extract_comment_insights: {e}")
-            return f"Error extracting insights: {e}"
+            return _message(
+                self.output_format, COMMENT_COLUMNS, f"Error extracting insights: {e}"
+            )
 
     @staticmethod
-    def _extract_themes(comments: list) -> str:
-        all_text = " ".join([c.get("text", "").lower() for c in comments])
-
-        themes = []
-        if any(w in all_text for w in ["bug", "issue", "problem", "error"]):
-            themes.append("Technical Issues")
-        if any(w in all_text for w in ["love", "great", "amazing", "awesome"]):
-            themes.append("Positive Sentiment")
-        if any(w in all_text for w in ["performance", "speed", "fast", "slow"]):
-            themes.append("Performance")
-        if any(w in all_text for w in ["security", "privacy", "vulnerability"]):
-            themes.append("Security & Privacy")
-        if any(w in all_text for w in ["ai", "llm", "gpt", "model", "machine learning"]):
-            themes.append("AI & ML")
-
-        return ", ".join(themes) if themes else "General Discussion"
+    def _format_themes(clusters: List["CommentCluster"]) -> str:
+        themes = [
+            f"#{n} {', '.join(cluster.terms) or 'misc'} ({cluster.size} comments)"
+            for n, cluster in enumerate(clusters, 1)
+        ]
+        return "Key Themes: " + "; ".join(themes)
@@ -1,4 +1,8 @@
-"""Logger configuration for HN Agent."""
+"""Logger configuration for HN Agent.
+
+Importing this module has no side effects: `logger` is the bare "hn_agent"
+logger, and entry points call `setup_logger` once to attach handlers.
+"""
 import logging
 import sys
 from pathlib import Path
@@ -38,4 +42,4 @@ def setup_logger(name: str = "hn_agent", level: str = "INFO") -> logging.Logger:
     return logger
 
 
-logger = setup_logger(level="INFO")
+logger = logging.getLogger("hn_agent")
@@ -0,0 +1,22 @@
+"""JSON encoding that uses orjson when it is installed."""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data: str) -> Any:
+    """Parse JSON text."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
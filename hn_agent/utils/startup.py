@@ -0,0 +1,36 @@
+"""Startup timing for entry points.
+
+Wrap each cold-start phase in `startup_timer.phase(...)` and log
+`startup_timer.report()` just before serving. For per-module import detail,
+run the entry point with `python -X importtime`.
+"""
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+
+class StartupTimer:
+    """Records the wall-clock duration of named startup phases."""
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self) -> str:
+        """Format the phase breakdown and the total since the timer started."""
+        width = max((len(name) for name, _ in self.phases), default=0)
+        lines = [f"  {name:<{width}}  {seconds:6.2f}s" for name, seconds in self.phases]
+        total = time.perf_counter() - self.started_at
+        lines.append(f"  {'total':<{width}}  {total:6.2f}s")
+        return "Startup time breakdown:\n" + "\n".join(lines)
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,69 @@
+"""Export HN top stories and their comment trees to an hourly-partitioned snapshot.
+
+Examples:
+    python scripts/export_snapshot.py --stories 30
+    python scripts/export_snapshot.py --format parquet --interval 3600
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import get_settings
+from hn_agent.services.hn_service import HNService
+from hn_agent.services.scheduler import configure_fetch_limits
+from hn_agent.services.snapshot import SNAPSHOT_FORMATS, SnapshotExporter, SnapshotWriter
+from hn_agent.utils.logger import logger, setup_logger
+
+
+def parse_arguments() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=settings.SNAPSHOT_DIR, help="Snapshot directory")
+    parser.add_argument(
+        "--format", default=settings.SNAPSHOT_FORMAT, choices=SNAPSHOT_FORMATS
+    )
+    parser.add_argument("--stories", type=int, default=30, help="Top stories to export")
+    parser.add_argument(
+        "--max-depth", type=int, default=None,
+        help="Comment nesting depth to export (default: whole tree, 0: stories only)",
+    )
+    parser.add_argument(
+        "--interval", type=int, default=0,
+        help="Repeat the export every N seconds (default: run once)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    settings = get_settings()
+    setup_logger(level=settings.LOG_LEVEL)
+    args = parse_arguments()
+
+    configure_fetch_limits(
+        max_concurrency=settings.HN_MAX_CONCURRENCY,
+        rate_per_second=settings.HN_RATE_LIMIT_PER_SECOND,
+        burst=settings.HN_RATE_BURST,
+        background_queue_limit=settings.HN_BACKGROUND_QUEUE_LIMIT,
+    )
+    hn_service = HNService()
+
+    while True:
+        start = time.perf_counter()
+        with SnapshotWriter(args.root, fmt=args.format) as writer:
+            written = SnapshotExporter(hn_service, writer).export(
+                story_count=args.stories, max_depth=args.max_depth
+            )
+        logger.info(
+            f"Exported {written} records to {args.root} in {time.perf_counter() - start:.1f}s"
+        )
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,19 +4,30 @@ Hides internal agent reasoning (thoughts, tool calls, observations).
 Shows only a progress indicator and the final answer.
 """
 
+import os
+import subprocess
 import sys
 from pathlib import Path
 from collections.abc import Generator
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import gradio as gr
-from smolagents import GradioUI
-from smolagents.memory import ActionStep, FinalAnswerStep, PlanningStep
+from hn_agent.utils.startup import startup_timer
 
-from config import get_settings
-from hn_agent.core.agent import create_hn_agent
-from hn_agent.utils.logger import logger
+with startup_timer.phase("import gradio + smolagents"):
+    import gradio as gr
+    from smolagents import CodeAgent, GradioUI
+    from smolagents.memory import ActionStep, FinalAnswerStep, PlanningStep
+
+with startup_timer.phase("import hn_agent"):
+    from config import Settings, get_settings
+    from hn_agent.core.memory import CHARS_PER_TOKEN, compact_memory
+    from hn_agent.core.prompts import AGENT_DESCRIPTION, AGENT_NAME
+    from hn_agent.services.scheduler import get_fetch_scheduler
+    from hn_agent.utils.logger import logger, setup_logger
+    from runtime import build_agent
 
 EXAMPLE_QUESTIONS = [
     "What's trending on Hacker News right now?",
@@ -29,7 +40,30 @@ PROGRESS_MESSAGES = ["Thinking...", "Working...", "Checking...", "Finalizing..."
 
 
 class HNGradioUI(GradioUI):
-    """GradioUI subclass with clean output: no internal steps, just results."""
+    """GradioUI subclass with clean output: no internal steps, just results.
+
+    `agent` may be a Future, so the server can start listening while the model
+    stack is still being built. The first request waits for it.
+    """
+
+    def __init__(self, agent: CodeAgent | Future, **kwargs) -> None:
+        identity = (
+            SimpleNamespace(name=AGENT_NAME, description=AGENT_DESCRIPTION)
+            if isinstance(agent, Future)
+            else agent
+        )
+        super().__init__(identity, **kwargs)
+        self.agent = agent
+
+    @property
+    def agent(self) -> CodeAgent:
+        if isinstance(self._agent, Future):
+            self._agent = self._agent.result()
+        return self._agent
+
+    @agent.setter
+    def agent(self, value: CodeAgent | Future) -> None:
+        self._agent = value
 
     def _stream_response(
         self, message: str | dict, history: list[dict]
@@ -40,6 +74,14 @@ class HNGradioUI(GradioUI):
         all_messages: list[gr.ChatMessage] = []
         step_count = 0
 
+        if not self.reset_agent_memory:
+            # Shrink earlier turns before the first model call of this one
+            saved = compact_memory(self.agent.memory.steps, keep_current_turn=False)
+            if saved:
+                logger.info(
+                    f"Compacted earlier turns: ~{saved // CHARS_PER_TOKEN} prompt tokens saved per call"
+                )
+
         for event in self.agent.run(
             task,
             images=task_files,
@@ -125,29 +167,115 @@ class HNGradioUI(GradioUI):
         return demo
 
 
+def _build_agent(settings: Settings) -> CodeAgent:
+    with startup_timer.phase("build agent (background)"):
+        agent = build_agent(settings)
+    logger.info(startup_timer.report())
+    return agent
+
+
+def _log_agent_failure(future: Future) -> None:
+    if future.exception() is not None:
+        logger.error(f"Agent construction failed: {future.exception()}")
+
+
+def build_ui(settings: Settings) -> HNGradioUI:
+    """Wrap the agent in the Gradio UI, building the agent in the background."""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-init")
+    agent_future = executor.submit(_build_agent, settings)
+    agent_future.add_done_callback(_log_agent_failure)
+    executor.shutdown(wait=False)
+    return HNGradioUI(agent_future)
+
+
+def create_app(ui: HNGradioUI):
+    """FastAPI app serving the chat UI at / and fetch-queue stats at /stats."""
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.get("/stats")
+    def stats() -> dict:
+        """Per-priority queue depths of this worker's upstream fetch scheduler."""
+        return {"pid": os.getpid(), "fetch_queues": get_fetch_scheduler().stats()}
+
+    return gr.mount_gradio_app(app, ui.create_app(), path="/")
+
+
+def _launch_workers(settings: Settings) -> None:
+    """Run GRADIO_WORKERS independent Gradio processes on consecutive ports.
+
+    Gradio keeps each session's queue and event stream inside one process, so
+    the workers cannot share a listening socket. Each one gets its own port,
+    starting at GRADIO_PORT, and a load balancer with sticky sessions routes
+    every browser to a single worker. All workers share the disk cache, and
+    the leader lock lets only one of them refresh it.
+    """
+    if not settings.ENABLE_CACHE or settings.CACHE_BACKEND != "disk":
+        raise ValueError(
+            "GRADIO_WORKERS > 1 requires ENABLE_CACHE=True and CACHE_BACKEND=disk"
+        )
+    if settings.GRADIO_SHARE:
+        logger.warning("GRADIO_SHARE is ignored in multi-worker mode")
+
+    ports = [settings.GRADIO_PORT + i for i in range(settings.GRADIO_WORKERS)]
+    workers = []
+    for port in ports:
+        env = {
+            **os.environ,
+            "GRADIO_PORT": str(port),
+            "GRADIO_WORKERS": "1",
+            "GRADIO_SHARE": "False",
+            "TELEGRAM_WITH_GRADIO": "False",
+        }
+        workers.append(subprocess.Popen([sys.executable, __file__], env=env))
+    logger.info(
+        f"Started {len(workers)} workers on ports {ports[0]}-{ports[-1]}; "
+        "put a load balancer with sticky sessions in front of them"
+    )
+
+    try:
+        for worker in workers:
+            worker.wait()
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.terminate()
+
+
 def launch_gradio_ui() -> None:
     """Launch the Gradio web interface for the HN Agent."""
+    settings = get_settings()
+    setup_logger(level=settings.LOG_LEVEL)
     logger.info("Launching Gradio UI...")
 
-    settings = get_settings()
+    if settings.GRADIO_WORKERS > 1:
+        if settings.TELEGRAM_WITH_GRADIO:
+            logger.warning(
+                "TELEGRAM_WITH_GRADIO is ignored in multi-worker mode; "
+                "run scripts/run_telegram.py as its own process"
+            )
+        _launch_workers(settings)
+        return
 
-    agent = create_hn_agent(
-        provider=settings.MODEL_PROVIDER,
-        model_id=settings.MODEL_ID,
-        hf_token=settings.HF_TOKEN,
-        openai_api_key=settings.OPENAI_API_KEY,
-        gemini_api_key=settings.GEMINI_API_KEY,
-        max_steps=settings.MAX_AGENT_STEPS,
-    )
+    ui = build_ui(settings)
 
-    ui = HNGradioUI(agent)
+    if settings.TELEGRAM_WITH_GRADIO:
+        from run_telegram import HNTelegramBot
 
+        HNTelegramBot(settings).start_in_background()
+
+    logger.info(startup_timer.report())
     logger.info(f"Starting on http://localhost:{settings.GRADIO_PORT}")
-    ui.launch(
-        server_name="0.0.0.0",
-        server_port=settings.GRADIO_PORT,
-        share=settings.GRADIO_SHARE,
-    )
+    if settings.GRADIO_SHARE:
+        # Share links need Gradio's own server, which has no /stats route.
+        logger.warning("GRADIO_SHARE is set: the /stats endpoint is not served")
+        ui.launch(server_name="0.0.0.0", server_port=settings.GRADIO_PORT, share=True)
+        return
+
+    import uvicorn
+
+    uvicorn.run(create_app(ui), host="0.0.0.0", port=settings.GRADIO_PORT)
 
 
 if __name__ == "__main__":
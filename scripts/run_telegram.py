@@ -0,0 +1,200 @@
+"""Telegram bot frontend for HN Agent.
+
+Runs on asyncio and shares the process-wide HN services with the Gradio UI.
+Agent runs are blocking, so they go to a bounded thread pool and never run
+on the event loop. Each chat has its own queue and agent: one chat's
+questions are answered in order, and different chats are answered in
+parallel.
+"""
+
+import asyncio
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from smolagents import CodeAgent
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
+
+from config import Settings, get_settings
+from hn_agent.core.memory import compact_memory
+from hn_agent.utils.logger import logger, setup_logger
+from runtime import build_agent, get_digest_builder, get_runtime
+
+# Telegram rejects messages longer than this.
+MAX_MESSAGE_CHARS = 4096
+
+WELCOME_MESSAGE = (
+    "Ask me about trending Hacker News threads, e.g. \"What's trending right now?\"\n"
+    "/digest [n] - summary of the top n threads with their discussions\n"
+    "/reset - forget this chat's history"
+)
+
+
+class HNTelegramBot:
+    """Telegram frontend backed by per-chat HN agents."""
+
+    def __init__(self, settings: Settings) -> None:
+        if not settings.TELEGRAM_BOT_TOKEN:
+            raise ValueError("TELEGRAM_BOT_TOKEN is required to run the Telegram bot")
+        self.settings = settings
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.TELEGRAM_MAX_WORKERS, thread_name_prefix="tg-agent"
+        )
+        # Pending jobs per chat; a chat's entries are dropped once its queue drains
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._drainers: Dict[int, asyncio.Task] = {}  # keeps the drain tasks referenced
+        # Least recently used chat first; evicted past TELEGRAM_MAX_CHATS
+        self._agents: "OrderedDict[int, CodeAgent]" = OrderedDict()
+        self._agents_lock = threading.Lock()
+
+    def build_application(self) -> Application:
+        application = (
+            Application.builder()
+            .token(self.settings.TELEGRAM_BOT_TOKEN)
+            .concurrent_updates(True)
+            .build()
+        )
+        application.add_handler(CommandHandler("start", self._on_start))
+        application.add_handler(CommandHandler("digest", self._on_digest))
+        application.add_handler(CommandHandler("reset", self._on_reset))
+        application.add_handler(
+            MessageHandler(
+                filters.UpdateType.MESSAGE & filters.TEXT & ~filters.COMMAND, self._on_message
+            )
+        )
+        return application
+
+    def run(self) -> None:
+        """Run the bot in the foreground (standalone mode)."""
+        logger.info("Starting Telegram bot (polling)...")
+        self.build_application().run_polling()
+
+    def start_in_background(self) -> threading.Thread:
+        """Run the bot on its own event loop next to another frontend."""
+        thread = threading.Thread(
+            target=lambda: asyncio.run(self._serve()), name="telegram-bot", daemon=True
+        )
+        thread.start()
+        logger.info("Telegram bot started in the background")
+        return thread
+
+    async def _serve(self) -> None:
+        application = self.build_application()
+        async with application:
+            await application.start()
+            await application.updater.start_polling()
+            await asyncio.Event().wait()
+
+    # --- Handlers -----------------------------------------------------------
+
+    async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await update.effective_message.reply_text(WELCOME_MESSAGE)
+
+    async def _on_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        chat_id = update.effective_chat.id
+        question = update.effective_message.text
+        await self._enqueue(
+            update, lambda: self._reply_from_thread(update, self._answer, chat_id, question)
+        )
+
+    async def _on_digest(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        try:
+            count = int(context.args[0]) if context.args else self.settings.DEFAULT_THREAD_COUNT
+        except ValueError:
+            count = self.settings.DEFAULT_THREAD_COUNT
+        count = max(1, min(count, self.settings.MAX_THREAD_COUNT))
+        await self._enqueue(
+            update, lambda: self._reply_from_thread(update, self._digest, count)
+        )
+
+    async def _on_reset(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        with self._agents_lock:
+            self._agents.pop(update.effective_chat.id, None)
+        await update.effective_message.reply_text("History cleared.")
+
+    # --- Per-chat queues ----------------------------------------------------
+
+    async def _enqueue(self, update: Update, job: Callable[[], Awaitable[None]]) -> None:
+        chat_id = update.effective_chat.id
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.settings.TELEGRAM_MAX_PENDING_PER_CHAT)
+            queue.put_nowait(job)
+            self._queues[chat_id] = queue
+            self._drainers[chat_id] = asyncio.create_task(self._drain(chat_id, queue))
+            return
+
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull:
+            await update.effective_message.reply_text(
+                "Still working on your earlier questions, please wait a moment."
+            )
+
+    async def _drain(self, chat_id: int, queue: asyncio.Queue) -> None:
+        """Run a chat's jobs in order, then forget the chat's queue once it is empty."""
+        while not queue.empty():
+            job = queue.get_nowait()
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"Telegram job failed: {e}")
+            finally:
+                queue.task_done()
+        # No await between the empty check and here, so _enqueue cannot slip in
+        del self._queues[chat_id]
+        del self._drainers[chat_id]
+
+    async def _reply_from_thread(self, update: Update, fn: Callable, *args) -> None:
+        message = update.effective_message
+        await message.chat.send_action("typing")
+        loop = asyncio.get_running_loop()
+        try:
+            answer = await loop.run_in_executor(self.executor, fn, *args)
+        except Exception as e:
+            logger.error(f"Telegram agent run failed: {e}")
+            answer = "Sorry, something went wrong while answering. Please try again."
+        for start in range(0, len(answer), MAX_MESSAGE_CHARS):
+            await message.reply_text(answer[start:start + MAX_MESSAGE_CHARS])
+
+    # --- Blocking work (runs on the executor) -------------------------------
+
+    def _agent_for(self, chat_id: int) -> CodeAgent:
+        with self._agents_lock:
+            agent = self._agents.get(chat_id)
+            if agent is not None:
+                self._agents.move_to_end(chat_id)
+                return agent
+
+        agent = build_agent(self.settings)
+        with self._agents_lock:
+            agent = self._agents.setdefault(chat_id, agent)
+            while len(self._agents) > self.settings.TELEGRAM_MAX_CHATS:
+                self._agents.popitem(last=False)
+        return agent
+
+    def _answer(self, chat_id: int, question: str) -> str:
+        agent = self._agent_for(chat_id)
+        compact_memory(agent.memory.steps, keep_current_turn=False)
+        return str(agent.run(question, reset=False))
+
+    def _digest(self, count: int) -> str:
+        # One builder per process: /digest needs a model, not a chat's agent
+        return get_digest_builder(self.settings).build(count=count)
+
+
+def main() -> None:
+    settings = get_settings()
+    setup_logger(level=settings.LOG_LEVEL)
+    get_runtime(settings)  # warm the shared cache before taking updates
+    HNTelegramBot(settings).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Process-wide services shared by every frontend.
+
+The Gradio UI and the Telegram bot can run in the same process. Both get
+their HNService and ArticleService from `get_runtime`, which builds them once.
+As a result there is one cache, one refresher and one fetch scheduler, no
+matter how many frontends or agents are running.
+"""
+
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from smolagents import CodeAgent
+
+from config import Settings
+from hn_agent.core.agent import create_digest_builder, create_hn_agent
+from hn_agent.core.digest import DigestBuilder
+from hn_agent.services.article_service import ArticleService
+from hn_agent.services.cache import create_cache
+from hn_agent.services.hn_service import HNService
+from hn_agent.services.refresher import CacheRefresher, LeaderLock
+from hn_agent.services.scheduler import configure_fetch_limits
+from hn_agent.services.snapshot import SnapshotReplay
+from hn_agent.utils.logger import logger
+from hn_agent.utils.startup import startup_timer
+
+
+@dataclass
+class Runtime:
+    """Shared services handed to every agent in the process."""
+
+    hn_service: HNService
+    article_service: ArticleService
+
+
+_runtime: Optional[Runtime] = None
+_runtime_lock = threading.Lock()
+_digest_builder: Optional[DigestBuilder] = None
+_digest_builder_lock = threading.Lock()
+
+
+def build_hn_service(settings: Settings) -> HNService:
+    """Create the process-wide HNService, warm its cache and start the refresher.
+
+    With CACHE_BACKEND=disk all workers on the host share one SQLite cache,
+    and a file lock next to it elects the single worker that refreshes it.
+    With HN_REPLAY_DIR set, HN data comes from the newest snapshot partition
+    there and nothing is fetched or cached.
+    """
+    configure_fetch_limits(
+        max_concurrency=settings.HN_MAX_CONCURRENCY,
+        rate_per_second=settings.HN_RATE_LIMIT_PER_SECOND,
+        burst=settings.HN_RATE_BURST,
+        background_queue_limit=settings.HN_BACKGROUND_QUEUE_LIMIT,
+    )
+    if settings.HN_REPLAY_DIR:
+        return HNService(replay=SnapshotReplay.latest(settings.HN_REPLAY_DIR))
+    if not settings.ENABLE_CACHE:
+        return HNService()
+
+    cache = create_cache(
+        backend=settings.CACHE_BACKEND,
+        path=settings.CACHE_PATH,
+        ttl_seconds=settings.CACHE_TTL_SECONDS,
+        max_entries=settings.CACHE_MAX_ENTRIES,
+    )
+    lock_path = (
+        f"{settings.CACHE_PATH}.lock" if settings.CACHE_BACKEND == "disk" else None
+    )
+    if settings.CACHE_REFRESH_SECONDS >= settings.CACHE_TTL_SECONDS:
+        logger.warning(
+            "CACHE_REFRESH_SECONDS >= CACHE_TTL_SECONDS: cached stories will "
+            "expire before they are refreshed"
+        )
+    refresher = CacheRefresher(
+        cache,
+        LeaderLock(lock_path),
+        interval_seconds=settings.CACHE_REFRESH_SECONDS,
+        story_count=settings.MAX_THREAD_COUNT,
+        thread_count=settings.DEFAULT_THREAD_COUNT,
+        comment_count=settings.MAX_COMMENTS_PER_THREAD,
+        comment_pool_size=settings.INSIGHT_COMMENT_POOL,
+    )
+    if settings.WARMUP_ON_START:
+        with startup_timer.phase("cache warm-up"):
+            refresher.warm_up()
+    refresher.start()
+    return HNService(cache=cache)
+
+
+def build_article_service(settings: Settings, hn_service: HNService) -> ArticleService:
+    """Create the article service on the same cache as `hn_service`."""
+    return ArticleService(
+        cache=hn_service.cache,
+        per_host_limit=settings.ARTICLE_PER_HOST_LIMIT,
+        timeout=settings.ARTICLE_TIMEOUT_SECONDS,
+        max_bytes=settings.ARTICLE_MAX_BYTES,
+        fresh_seconds=settings.ARTICLE_FRESH_SECONDS,
+    )
+
+
+def get_runtime(settings: Settings) -> Runtime:
+    """Return the process-wide services, building them on first use."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            hn_service = build_hn_service(settings)
+            _runtime = Runtime(
+                hn_service=hn_service,
+                article_service=build_article_service(settings, hn_service),
+            )
+        return _runtime
+
+
+def get_digest_builder(settings: Settings) -> DigestBuilder:
+    """Return the process-wide DigestBuilder, building its model client on first use."""
+    global _digest_builder
+    with _digest_builder_lock:
+        if _digest_builder is None:
+            _digest_builder = create_digest_builder(
+                provider=settings.MODEL_PROVIDER,
+                model_id=settings.MODEL_ID,
+                hf_token=settings.HF_TOKEN,
+                openai_api_key=settings.OPENAI_API_KEY,
+                gemini_api_key=settings.GEMINI_API_KEY,
+                hn_service=get_runtime(settings).hn_service,
+                digest_concurrency=settings.DIGEST_CONCURRENCY,
+                digest_max_comments=settings.MAX_COMMENTS_PER_THREAD,
+            )
+        return _digest_builder
+
+
+def build_agent(settings: Settings) -> CodeAgent:
+    """Create a new agent that uses the shared services."""
+    runtime = get_runtime(settings)
+    return create_hn_agent(
+        provider=settings.MODEL_PROVIDER,
+        model_id=settings.MODEL_ID,
+        hf_token=settings.HF_TOKEN,
+        openai_api_key=settings.OPENAI_API_KEY,
+        gemini_api_key=settings.GEMINI_API_KEY,
+        max_steps=settings.MAX_AGENT_STEPS,
+        hn_service=runtime.hn_service,
+        article_service=runtime.article_service,
+        digest_concurrency=settings.DIGEST_CONCURRENCY,
+        digest_max_comments=settings.MAX_COMMENTS_PER_THREAD,
+        tool_output_format=settings.TOOL_OUTPUT_FORMAT,
+        comment_pool_size=settings.INSIGHT_COMMENT_POOL,
+    )
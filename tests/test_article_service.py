@@ -0,0 +1,191 @@
+import threading
+import time
+
+import pytest
+
+from hn_agent.services.article_service import (
+    ArticleService,
+    BlockedURLError,
+    check_public_url,
+    extract_main_text,
+)
+
+PAGE = b"<html><head><title>Post</title></head><body><p>Body text.</p></body></html>"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, chunks=(PAGE,), chunk_delay=0.0):
+        self.status_code = status_code
+        self.headers = {"Content-Type": "text/html", **(headers or {})}
+        self.chunks = list(chunks)
+        self.chunk_delay = chunk_delay
+        self.chunks_read = 0
+        self.closed = False
+
+    @property
+    def is_redirect(self):
+        return self.status_code in (301, 302, 303, 307, 308) and "Location" in self.headers
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            time.sleep(self.chunk_delay)
+            self.chunks_read += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Stands in for requests.Session; `routes` maps URL to a response or a callable."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls.append((url, dict(headers or {})))
+        route = self.routes[url]
+        return route() if callable(route) else route
+
+
+def make_service(routes, **kwargs):
+    service = ArticleService(**kwargs)
+    service.session = FakeSession(routes)
+    return service
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://127.0.0.1/admin",
+        "http://[::1]:8080/",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://10.1.2.3/",
+        "http://192.168.0.1/",
+        "file:///etc/passwd",
+        "ftp://93.184.216.34/",
+        "http:///no-host",
+    ],
+)
+def test_non_public_urls_are_blocked(url):
+    with pytest.raises(BlockedURLError):
+        check_public_url(url)
+
+
+def test_public_address_is_allowed():
+    check_public_url("https://93.184.216.34/article")
+
+
+def test_extract_prefers_article_and_drops_boilerplate():
+    html = b"""<html><head><title>Post</title></head><body>
+      <nav><p>Home | About</p></nav>
+      <article><h1>Heading</h1><p>First paragraph.</p><ul><li><p>Item</p></li></ul></article>
+      <footer><p>Copyright</p></footer>
+    </body></html>"""
+    title, text = extract_main_text(html)
+    assert title == "Post"
+    assert text == "Heading\n\nFirst paragraph.\n\nItem"
+
+
+def test_extract_truncates_on_word_boundary():
+    _, text = extract_main_text("<p>" + "word " * 100 + "</p>", max_chars=22)
+    assert text == "word word word word..."
+
+
+URL = "http://93.184.216.34/post"
+OTHER_HOST_URL = "http://93.184.216.35/post"
+
+
+def test_fetches_and_caches_article():
+    service = make_service({URL: FakeResponse(headers={"ETag": '"v1"'})})
+    article = service.get_article(URL)
+    assert (article["title"], article["text"], article["etag"]) == ("Post", "Body text.", '"v1"')
+
+    assert service.get_article(URL) == article  # fresh: served from cache
+    assert len(service.session.calls) == 1
+
+
+def test_stale_entry_is_revalidated_with_304():
+    stale = {
+        "url": URL, "title": "Post", "text": "Body text.", "etag": '"v1"',
+        "last_modified": "Mon, 19 Oct 2026 10:00:00 GMT", "fetched_at": time.time() - 7200,
+    }
+    service = make_service({URL: FakeResponse(status_code=304)}, fresh_seconds=3600)
+    service.cache.set(service.CACHE_PREFIX + URL, stale)
+
+    article = service.get_article(URL)
+
+    _, headers = service.session.calls[0]
+    assert headers == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 19 Oct 2026 10:00:00 GMT",
+    }
+    assert {k: v for k, v in article.items() if k != "fetched_at"} == {
+        k: v for k, v in stale.items() if k != "fetched_at"
+    }
+    assert article["fetched_at"] > stale["fetched_at"] + 7000
+    assert service.cache.get(service.CACHE_PREFIX + URL) == article
+
+
+def test_body_is_capped_at_max_bytes():
+    response = FakeResponse(chunks=[b"<p>" + b"a " * 50] * 10)
+    service = make_service({URL: response}, max_bytes=250)
+    article = service.get_article(URL)
+    assert response.chunks_read == 3
+    assert len(article["text"]) < 250
+    assert response.closed
+
+
+def test_non_html_is_skipped():
+    service = make_service({URL: FakeResponse(headers={"Content-Type": "application/pdf"})})
+    assert service.get_article(URL) is None
+
+
+def test_redirect_to_private_host_is_refused():
+    redirect = FakeResponse(status_code=302, headers={"Location": "http://127.0.0.1/"})
+    service = make_service({URL: redirect})
+    with pytest.raises(BlockedURLError):
+        service.get_article(URL)
+
+
+def test_redirect_takes_the_target_host_slot():
+    redirect = FakeResponse(status_code=302, headers={"Location": OTHER_HOST_URL})
+    service = make_service(
+        {URL: redirect, OTHER_HOST_URL: FakeResponse()}, per_host_limit=1
+    )
+    slot = service._host_slot("93.184.216.35")
+    slot.acquire()
+    worker = threading.Thread(target=service.get_article, args=(URL,))
+    worker.start()
+    worker.join(timeout=0.2)
+    assert worker.is_alive()  # waiting for the redirect target's slot
+    slot.release()
+    worker.join(timeout=1)
+    assert not worker.is_alive()
+    assert [url for url, _ in service.session.calls] == [URL, OTHER_HOST_URL]
+
+
+def test_download_stops_at_deadline():
+    slow = FakeResponse(chunks=[b"<p>chunk</p>"] * 50, chunk_delay=0.02)
+    service = make_service({URL: slow})
+    with pytest.raises(TimeoutError):
+        service.get_article(URL, deadline=time.monotonic() + 0.1)
+    assert slow.chunks_read < 50
+
+
+def test_batch_returns_what_finished_by_the_deadline():
+    def stalled():
+        time.sleep(1.0)
+        return FakeResponse()
+
+    service = make_service(
+        {URL: FakeResponse(), OTHER_HOST_URL: stalled}, batch_deadline_seconds=0.2
+    )
+    start = time.monotonic()
+    articles = service.get_articles([URL, OTHER_HOST_URL, URL])
+    assert time.monotonic() - start < 0.6
+    assert list(articles) == [URL]
@@ -0,0 +1,136 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("helium")
+pytest.importorskip("selenium")
+
+from vision_web_browser import BrowserPool  # noqa: E402
+
+
+class FakeDriver:
+    """Just enough of a Selenium driver for BrowserPool: tabs, CDP contexts, health checks."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.name = f"driver-{next(self._ids)}"
+        self.healthy = True
+        self.quit_called = False
+        self.window_handles = ["home"]
+        self.current_window_handle = "home"
+        self.tab_contexts = {}
+        self.switch_to = self
+
+    def window(self, handle):
+        assert handle in self.window_handles
+        self.current_window_handle = handle
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("browser crashed")
+        return 1
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Target.createBrowserContext":
+            return {"browserContextId": f"ctx-{next(self._ids)}"}
+        if command == "Target.createTarget":
+            tab = f"tab-{next(self._ids)}"
+            self.window_handles.append(tab)
+            self.tab_contexts[tab] = params["browserContextId"]
+            return {"targetId": tab}
+        if command == "Target.disposeBrowserContext":
+            for tab, context in list(self.tab_contexts.items()):
+                if context == params["browserContextId"]:
+                    self.window_handles.remove(tab)
+                    del self.tab_contexts[tab]
+            return {}
+        raise AssertionError(command)
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakePool(BrowserPool):
+    """BrowserPool whose launches follow a script: "ok", "fail" or a delay in seconds."""
+
+    def __init__(self, launches, **kwargs):
+        self.launches = iter(launches)
+        self.launched = []
+        self._script_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def _launch(self):
+        with self._script_lock:
+            step = next(self.launches, "ok")
+        if step == "fail":
+            raise RuntimeError("chromedriver missing")
+        if step != "ok":
+            time.sleep(step)
+        driver = FakeDriver()
+        self.launched.append(driver)
+        return driver
+
+
+def test_session_runs_in_a_fresh_context_and_is_reused():
+    pool = FakePool([], size=1)
+    with pool.session() as driver:
+        assert driver.current_window_handle.startswith("tab-")
+        driver.execute_cdp_cmd("Target.createTarget", {"browserContextId": "stray"})
+    assert driver.window_handles == ["home"]
+    assert driver.current_window_handle == "home"
+
+    with pool.session() as again:
+        assert again is driver
+    assert len(pool.launched) == 1
+
+
+def test_spare_session_takes_over_while_recycled_browser_relaunches():
+    pool = FakePool(["ok", "ok", 1.0], size=2, max_uses=1)
+    with pool.session() as first:
+        pass
+    assert first.quit_called
+
+    start = time.monotonic()
+    with pool.session() as second:
+        assert second is not first
+    assert time.monotonic() - start < 0.5  # did not wait for the slow relaunch
+
+
+def test_unhealthy_browser_is_replaced():
+    pool = FakePool([], size=1)
+    with pool.session() as driver:
+        pass
+    driver.healthy = False
+    with pool.session(timeout=2) as replacement:
+        assert replacement is not driver
+    assert driver.quit_called
+
+
+def test_pool_fails_fast_when_no_browser_launches():
+    with pytest.raises(RuntimeError, match="Could not launch"):
+        FakePool(["fail", "fail"], size=2)
+
+
+def test_acquire_fails_once_every_relaunch_failed():
+    pool = FakePool(["ok", "fail"], size=1, max_uses=1, acquire_timeout=5)
+    with pool.session():
+        pass
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="No browser left"):
+        with pool.session():
+            pass
+    assert time.monotonic() - start < 2
+
+
+def test_acquire_times_out_when_every_session_is_busy():
+    pool = FakePool([], size=1)
+    with pool.session():
+        with pytest.raises(TimeoutError):
+            with pool.session(timeout=0.2):
+                pass
@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hn_agent.services.cache import DiskCache, MemoryCache, create_cache
+from hn_agent.services.refresher import LeaderLock
+
+
+@pytest.fixture(params=["memory", "disk"])
+def cache(request, tmp_path):
+    return create_cache(request.param, path=tmp_path / "cache.sqlite3", ttl_seconds=60)
+
+
+def test_round_trip(cache):
+    assert cache.get("missing") is None
+    cache.set("item/1.json", {"id": 1, "kids": [2, 3]})
+    assert cache.get("item/1.json") == {"id": 1, "kids": [2, 3]}
+
+
+def test_entries_expire(cache):
+    cache.set("short", [1], ttl_seconds=0)
+    time.sleep(0.01)
+    assert cache.get("short") is None
+
+
+def test_set_replaces_value(cache):
+    cache.set("key", 1)
+    cache.set("key", 2)
+    assert cache.get("key") == 2
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    path = tmp_path / "shared.sqlite3"
+    DiskCache(path).set("topstories.json", [3, 2, 1])
+    assert DiskCache(path).get("topstories.json") == [3, 2, 1]
+
+
+def test_disk_cache_across_threads(tmp_path):
+    cache = DiskCache(tmp_path / "threads.sqlite3")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda i: cache.set(f"k{i}", i), range(20)))
+    assert [cache.get(f"k{i}") for i in range(20)] == list(range(20))
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_cache("redis")
+
+
+def test_memory_cache_default_ttl():
+    cache = MemoryCache(ttl_seconds=0)
+    cache.set("key", "value")
+    time.sleep(0.01)
+    assert cache.get("key") is None
+
+
+def test_leader_lock_elects_one_holder(tmp_path):
+    path = tmp_path / "cache.lock"
+    first, second = LeaderLock(path), LeaderLock(path)
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    first.release()
+    assert second.try_acquire()
+    second.release()
+
+
+def test_leader_lock_without_path_is_always_leader():
+    assert LeaderLock().try_acquire()
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_memory_cache_purges_expired_entries_on_write(monkeypatch):
+    monkeypatch.setattr(MemoryCache, "PURGE_EVERY", 3)
+    cache = MemoryCache()
+    cache.set("stale-1", 1, ttl_seconds=0)
+    cache.set("stale-2", 2, ttl_seconds=0)
+    time.sleep(0.01)
+    cache.set("fresh", 3)  # third write triggers the sweep
+    assert len(cache) == 1
+    assert cache.get("fresh") == 3
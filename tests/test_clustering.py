@@ -0,0 +1,76 @@
+import random
+import time
+
+import numpy as np
+import pytest
+
+from hn_agent.core.clustering import _allocate, cluster_comments, tfidf_matrix, tokenize
+
+TOPICS = [
+    ["rust", "borrow", "checker", "lifetimes", "compiler"],
+    ["pricing", "subscription", "license", "refund", "billing"],
+    ["privacy", "tracking", "gdpr", "cookies", "consent"],
+]
+
+
+def synthetic_comments(n, seed=0):
+    rng = random.Random(seed)
+    filler = "quick brown fox jumps over lazy dog today".split()
+    return [
+        " ".join(rng.choices(TOPICS[i % len(TOPICS)], k=5) + rng.choices(filler, k=5))
+        for i in range(n)
+    ]
+
+
+def test_tokenize_strips_html_urls_and_stop_words():
+    text = "I think <i>Rust&#x27;s</i> borrow checker is great: https://example.com/x"
+    assert tokenize(text) == ["rust's", "borrow", "checker", "great"]
+
+
+def test_tfidf_rows_are_unit_length():
+    matrix, vocabulary = tfidf_matrix(synthetic_comments(30))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    assert np.allclose(norms, 1.0)
+    assert "rust" in vocabulary
+
+
+@pytest.mark.parametrize(
+    "sizes, slots, expected",
+    [
+        ([238, 139, 133, 132, 126, 79, 78, 75], 20, [4, 3, 3, 2, 2, 2, 2, 2]),
+        ([10, 5, 1], 2, [1, 1, 0]),
+        ([10, 5, 1], 20, [10, 5, 1]),
+        ([3, 1], 3, [2, 1]),
+    ],
+)
+def test_allocate(sizes, slots, expected):
+    assert _allocate(np.array(sizes), slots) == expected
+
+
+def test_clusters_separate_topics_and_pick_representatives():
+    texts = synthetic_comments(300) + ["+1", ""]
+    clusters = cluster_comments(texts, representatives=20)
+
+    assert sum(len(c.representatives) for c in clusters) == 20
+    assert sum(c.size for c in clusters) == 300  # vocabulary-free comments left out
+    sizes = [c.size for c in clusters]
+    assert sizes == sorted(sizes, reverse=True)
+    for cluster in clusters:
+        topics = {i % len(TOPICS) for i in cluster.representatives}
+        assert len(topics) == 1
+        assert set(cluster.terms) <= set(TOPICS[topics.pop()]) | {"quick", "brown", "fox", "jumps", "lazy", "dog", "today"}
+
+
+def test_small_and_empty_inputs():
+    assert cluster_comments([]) == []
+    (only,) = cluster_comments(["hello world", "foo"], representatives=5)
+    assert only.representatives == [0, 1]
+    (blank,) = cluster_comments(["+1", ""], representatives=5)
+    assert blank.representatives == [0, 1] and blank.terms == []
+
+
+def test_thousand_comments_cluster_quickly():
+    texts = synthetic_comments(1000)
+    start = time.perf_counter()
+    cluster_comments(texts)
+    assert time.perf_counter() - start < 1.0
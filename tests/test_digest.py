@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from hn_agent.core.digest import DigestBuilder
+from hn_agent.core.prompts import ERROR_API_FAILURE
+
+REPLY = {
+    "summary": "A new database.",
+    "popularity_analysis": "Benchmarks.",
+    "top_comments_summary": ["Fast", "Young project"],
+}
+
+
+class FakeHNService:
+    def __init__(self, count=3):
+        self.stories = [
+            {"id": i, "title": f"Story {i}", "score": 10 * i, "descendants": i, "url": f"https://x/{i}"}
+            for i in range(1, count + 1)
+        ]
+
+    def get_top_stories(self, count=5):
+        return self.stories[:count]
+
+    def get_comments(self, story_id, max_comments=5):
+        return [{"by": "pg", "text": f"comment on {story_id}"}][:max_comments]
+
+
+class FakeModel:
+    """Replies per story title; tracks how many calls run at once."""
+
+    def __init__(self, reply=json.dumps(REPLY), delays=None, fail_for=()):
+        self.reply = reply
+        self.delays = delays or {}
+        self.fail_for = set(fail_for)
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate(self, messages):
+        prompt = messages[0]["content"][0]["text"]
+        title = next(line for line in prompt.splitlines() if line.startswith("Title: "))[7:]
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delays.get(title, 0.05))
+            if title in self.fail_for:
+                raise RuntimeError("rate limited")
+            return SimpleNamespace(content=self.reply)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def test_parse_fields_reads_fenced_json_and_joins_lists():
+    fields = DigestBuilder._parse_fields("```json\n" + json.dumps(REPLY) + "\n```")
+    assert fields == {
+        "summary": "A new database.",
+        "popularity_analysis": "Benchmarks.",
+        "top_comments_summary": "Fast\nYoung project",
+    }
+
+
+def test_parse_fields_falls_back_to_raw_text():
+    assert DigestBuilder._parse_fields("Not JSON {at all") == {
+        "summary": "Not JSON {at all",
+        "popularity_analysis": "N/A",
+        "top_comments_summary": "N/A",
+    }
+
+
+def test_parse_fields_takes_first_object_of_an_array():
+    reply = json.dumps([{"summary": "first"}, {"summary": "second"}])
+    assert DigestBuilder._parse_fields(reply)["summary"] == "first"
+    assert DigestBuilder._parse_fields('["just", "strings"]')["summary"] == '["just", "strings"]'
+
+
+def test_digest_keeps_rank_order():
+    model = FakeModel(delays={"Story 1": 0.2, "Story 2": 0.1, "Story 3": 0.0})
+    digest = DigestBuilder(model, FakeHNService()).build(count=3)
+    assert digest.startswith("# Top 3 Hacker News Threads")
+    positions = [digest.index(f"## #{rank} - Story {rank}") for rank in (1, 2, 3)]
+    assert positions == sorted(positions)
+    assert digest.count("A new database.") == 3
+
+
+def test_failed_map_call_falls_back_for_that_thread_only():
+    model = FakeModel(fail_for={"Story 2"})
+    digest = DigestBuilder(model, FakeHNService()).build(count=3)
+    assert digest.count("Summary unavailable.") == 1
+    assert digest.count("A new database.") == 2
+
+
+def test_map_calls_are_capped_at_max_workers():
+    model = FakeModel()
+    DigestBuilder(model, FakeHNService(count=6), max_workers=2).build(count=6)
+    assert model.peak == 2
+
+
+def test_no_stories_reports_api_failure():
+    assert DigestBuilder(FakeModel(), FakeHNService(count=0)).build() == ERROR_API_FAILURE
@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from hn_agent.services.hn_service import HNService
+from hn_agent.services.scheduler import FetchScheduler, TokenBucket
+
+
+def make_service(documents, delays=None):
+    """HNService whose HTTP layer serves `documents` keyed by API path."""
+    service = HNService(
+        scheduler=FetchScheduler(max_workers=8), rate_limiter=TokenBucket(rate_per_second=0)
+    )
+    delays = delays or {}
+
+    def fake_fetch(url):
+        path = url[len(HNService.BASE_URL) + 1:]
+        time.sleep(delays.get(path, 0))
+        return documents.get(path)
+
+    service._fetch_with_retry = fake_fetch
+    return service
+
+
+def story(item_id, **fields):
+    return {"id": item_id, "type": "story", "title": f"Story {item_id}", "score": 1, **fields}
+
+
+@pytest.fixture
+def documents():
+    return {
+        "topstories.json": [1, 2, 3, 4, 5, 6, 7, 8],
+        "item/1.json": story(1),
+        "item/2.json": {"id": 2, "type": "job", "title": "Hiring"},
+        "item/3.json": story(3, dead=True),
+        "item/4.json": story(4),
+        "item/5.json": {"id": 5, "deleted": True},
+        "item/6.json": story(6),
+        "item/7.json": story(7),
+        "item/8.json": story(8),
+    }
+
+
+def test_skipped_items_are_refilled_in_rank_order(documents):
+    stories = make_service(documents).get_top_stories(count=4)
+    assert [s["id"] for s in stories] == [1, 4, 6, 7]
+
+
+def test_returns_fewer_when_ranking_runs_out(documents):
+    stories = make_service(documents).get_top_stories(count=20)
+    assert [s["id"] for s in stories] == [1, 4, 6, 7, 8]
+
+
+def test_missing_id_list_returns_empty(documents):
+    del documents["topstories.json"]
+    assert make_service(documents).get_top_stories(count=3) == []
+
+
+def test_deadline_covers_id_list_fetch(documents):
+    service = make_service(
+        documents, delays={"topstories.json": 0.5, "item/1.json": 0.5, "item/4.json": 0.5}
+    )
+    start = time.monotonic()
+    service.get_top_stories(count=2, deadline_seconds=0.8)
+    assert time.monotonic() - start < 1.0
+
+
+def test_deadline_hit_on_id_list_returns_empty(documents):
+    service = make_service(documents, delays={"topstories.json": 0.5})
+    assert service.get_top_stories(count=2, deadline_seconds=0.1) == []
+
+
+
+def test_comment_tree_is_breadth_first_and_capped():
+    documents = {
+        "item/1.json": story(1, kids=[10, 11]),
+        "item/10.json": {"id": 10, "type": "comment", "text": "a", "kids": [20, 21]},
+        "item/11.json": {"id": 11, "type": "comment", "text": "b", "kids": [22]},
+        "item/20.json": {"id": 20, "type": "comment", "text": "c"},
+        "item/21.json": {"id": 21, "type": "comment", "text": "d"},
+        "item/22.json": {"id": 22, "type": "comment", "text": "e"},
+    }
+    service = make_service(documents)
+    assert [c["id"] for c in service.get_comment_tree(1, max_comments=10)] == [10, 11, 20, 21, 22]
+    assert [c["id"] for c in service.get_comment_tree(1, max_comments=3)] == [10, 11, 20]
+
+
+def test_comment_tree_stops_at_deadline():
+    documents = {
+        "item/1.json": story(1, kids=[10, 11]),
+        "item/10.json": {"id": 10, "type": "comment", "text": "fast", "kids": [20]},
+        "item/11.json": {"id": 11, "type": "comment", "text": "slow"},
+        "item/20.json": {"id": 20, "type": "comment", "text": "reply"},
+    }
+    service = make_service(documents, delays={"item/11.json": 1.0})
+    start = time.monotonic()
+    comments = service.get_comment_tree(1, max_comments=10, deadline_seconds=0.3)
+    assert time.monotonic() - start < 0.6
+    assert [c["id"] for c in comments] == [10]
+
+
+def test_prefetch_walks_comment_pools_of_leading_threads(documents):
+    documents["item/1.json"] = story(1, kids=[10])
+    documents["item/10.json"] = {"id": 10, "type": "comment", "text": "a", "kids": [20]}
+    documents["item/20.json"] = {"id": 20, "type": "comment", "text": "b"}
+    service = make_service(documents)
+    assert service.prefetch(story_count=3, thread_count=1, max_comments=1) == 4
+    assert service.prefetch(story_count=3, thread_count=1, max_comments=1, comment_pool_size=10) == 5
@@ -0,0 +1,98 @@
+from hn_agent.core.memory import COMPACTED_PREFIX, compact_memory, summarize_observation
+from hn_agent.tools.records import Records
+from hn_agent.tools.tools import (
+    COMMENT_COLUMNS,
+    STORY_COLUMNS,
+    ExtractCommentInsightsTool,
+    FetchTopStoriesToolTool,
+)
+
+STORIES = Records(
+    [
+        {"id": 41000001, "title": "Show HN: A | pipe", "score": 120, "comments": 40,
+         "ratio": 3.0, "url": "https://example.com", "by": "alice"},
+        {"id": 41000002, "title": "Ask HN: Something", "score": 10, "comments": 5,
+         "ratio": 2.0, "url": None, "by": "bob"},
+    ],
+    STORY_COLUMNS,
+)
+
+
+def test_records_render_as_table():
+    lines = str(STORIES).splitlines()
+    assert lines[0] == " | ".join(STORY_COLUMNS)
+    assert lines[1] == "41000001 | Show HN: A / pipe | 120 | 40 | 3.0 | https://example.com | alice"
+    assert lines[2].endswith("| 10 | 5 | 2.0 |  | bob")
+    assert STORIES[0]["id"] == 41000001
+
+
+def test_records_truncate_cells_and_add_footer():
+    records = Records([{"text": "x" * 50}], ["text"], max_cell_chars=10, footer="Key Themes: a")
+    assert str(records).splitlines() == ["text", "xxxxxxx...", "Key Themes: a"]
+
+
+def test_summarize_keeps_story_rows():
+    summary = summarize_observation(str(STORIES) * 20, max_chars=400)
+    assert summary.startswith(COMPACTED_PREFIX)
+    assert "Story ID: 41000001 | Title: Show HN: A / pipe" in summary
+
+
+def test_summarize_ignores_comment_rows():
+    comments = Records(
+        [{"cluster": 1, "id": 41000123, "by": "carol", "text": "long comment " * 20}],
+        COMMENT_COLUMNS,
+        footer="Key Themes: #1 rust (1 comments)",
+    )
+    legacy = "id | by | text\n41000123 | carol | a comment"
+    for text in (str(comments), legacy):
+        assert "Story ID" not in summarize_observation(text)
+
+
+def test_summarize_keeps_text_format_references():
+    text = "#1\nStory ID: 42\nTitle: Hello\nScore: 1 | Comments: 2\n" * 30
+    summary = summarize_observation(text)
+    assert "Story ID: 42\nTitle: Hello" in summary
+
+
+class _EmptyService:
+    def get_top_stories(self, count):
+        return []
+
+    def get_comment_tree(self, story_id, max_comments):
+        raise RuntimeError("offline")
+
+
+def test_empty_and_error_results_stay_records():
+    stories = FetchTopStoriesToolTool(_EmptyService()).forward(3)
+    assert isinstance(stories, Records) and stories == []
+    assert "No stories found" in str(stories)
+
+    comments = ExtractCommentInsightsTool(_EmptyService()).forward(123)
+    assert isinstance(comments, Records) and comments == []
+    assert "offline" in str(comments)
+
+    invalid = ExtractCommentInsightsTool(_EmptyService()).forward(-1)
+    assert isinstance(invalid, Records) and "Invalid story_id" in str(invalid)
+
+
+def test_text_format_keeps_plain_messages():
+    tool = FetchTopStoriesToolTool(_EmptyService(), output_format="text")
+    assert tool.forward(3) == "No stories found on Hacker News right now."
+
+
+def test_compact_memory_skips_current_turn():
+    from smolagents.memory import ActionStep, TaskStep
+    from smolagents.monitoring import Timing
+
+    def action(number, observations):
+        step = ActionStep(step_number=number, timing=Timing(start_time=0.0))
+        step.observations = observations
+        return step
+
+    big = str(STORIES) * 20
+    steps = [TaskStep(task="first"), action(1, big), TaskStep(task="second"), action(2, big)]
+    saved = compact_memory(steps, max_chars=400)
+    assert saved > 0
+    assert steps[1].observations.startswith(COMPACTED_PREFIX)
+    assert steps[3].observations == big
+    assert compact_memory(steps, max_chars=400) == 0
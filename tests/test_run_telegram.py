@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import run_telegram
+from config import Settings
+from run_telegram import HNTelegramBot
+
+
+class FakeMessage:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text):
+        self.replies.append(text)
+
+
+def make_update(chat_id=1):
+    return SimpleNamespace(
+        effective_chat=SimpleNamespace(id=chat_id), effective_message=FakeMessage()
+    )
+
+
+def make_bot(max_pending=3):
+    return HNTelegramBot(
+        Settings(TELEGRAM_BOT_TOKEN="token", TELEGRAM_MAX_PENDING_PER_CHAT=max_pending)
+    )
+
+
+async def settle(bot):
+    while bot._drainers:
+        await asyncio.gather(*bot._drainers.values())
+
+
+def recorder(log, name, delay=0.0):
+    async def job():
+        await asyncio.sleep(delay)
+        log.append(name)
+    return job
+
+
+@pytest.mark.asyncio
+async def test_chat_jobs_run_in_order_and_queues_are_dropped_when_drained():
+    bot = make_bot()
+    log = []
+    await bot._enqueue(make_update(1), recorder(log, "a1", delay=0.02))
+    await bot._enqueue(make_update(1), recorder(log, "a2"))
+    await bot._enqueue(make_update(2), recorder(log, "b1"))
+    assert set(bot._queues) == {1, 2}
+
+    await settle(bot)
+
+    assert log.index("a1") < log.index("a2")
+    assert bot._queues == {} and bot._drainers == {}
+
+
+@pytest.mark.asyncio
+async def test_chat_gets_a_new_queue_after_draining():
+    bot = make_bot()
+    log = []
+    await bot._enqueue(make_update(), recorder(log, "first"))
+    await settle(bot)
+    await bot._enqueue(make_update(), recorder(log, "second"))
+    await settle(bot)
+    assert log == ["first", "second"]
+    assert bot._queues == {}
+
+
+@pytest.mark.asyncio
+async def test_failing_job_does_not_stop_the_queue():
+    bot = make_bot()
+    log = []
+
+    async def boom():
+        raise RuntimeError("agent crashed")
+
+    await bot._enqueue(make_update(), boom)
+    await bot._enqueue(make_update(), recorder(log, "after"))
+    await settle(bot)
+    assert log == ["after"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_replies_instead_of_queueing():
+    bot = make_bot(max_pending=1)
+    log = []
+    await bot._enqueue(make_update(), recorder(log, "kept"))
+    update = make_update()
+    await bot._enqueue(update, recorder(log, "dropped"))
+    assert update.effective_message.replies == [
+        "Still working on your earlier questions, please wait a moment."
+    ]
+    await settle(bot)
+    assert log == ["kept"]
+
+
+def test_digest_uses_the_shared_builder_without_a_chat_agent(monkeypatch):
+    calls = []
+    builder = SimpleNamespace(build=lambda count: calls.append(count) or "digest")
+    monkeypatch.setattr(run_telegram, "get_digest_builder", lambda settings: builder)
+    bot = make_bot()
+    assert bot._digest(3) == "digest"
+    assert calls == [3]
+    assert len(bot._agents) == 0
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from hn_agent.services.scheduler import FetchScheduler, Priority, SchedulerBusyError, TokenBucket
+
+
+def block_workers(scheduler):
+    """Occupy every worker until the returned event is set."""
+    gate = threading.Event()
+    for _ in range(scheduler.max_workers):
+        scheduler.submit(gate.wait)
+    while scheduler.stats()["running"] < scheduler.max_workers:
+        time.sleep(0.001)
+    return gate
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    bucket = TokenBucket(rate_per_second=20, burst=5)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.15
+
+
+def test_token_bucket_disabled():
+    bucket = TokenBucket(rate_per_second=0, burst=1)
+    start = time.monotonic()
+    for _ in range(1000):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.1
+
+
+def test_submit_returns_result_and_propagates_errors():
+    scheduler = FetchScheduler(max_workers=2)
+    assert scheduler.submit(lambda a, b: a + b, 2, 3).result(timeout=1) == 5
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        scheduler.submit(fail).result(timeout=1)
+
+
+def test_interactive_work_runs_before_queued_background_work():
+    scheduler = FetchScheduler(max_workers=1)
+    gate = block_workers(scheduler)
+    order = []
+
+    background = [
+        scheduler.submit(order.append, f"bg{i}", priority=Priority.BACKGROUND) for i in range(3)
+    ]
+    interactive = scheduler.submit(order.append, "fg", priority=Priority.INTERACTIVE)
+    stats = scheduler.stats()
+    assert stats["queued_background"] == 3
+    assert stats["queued_interactive"] == 1
+
+    gate.set()
+    interactive.result(timeout=1)
+    for future in background:
+        future.result(timeout=1)
+    assert order == ["fg", "bg0", "bg1", "bg2"]
+
+
+def test_background_work_is_shed_when_queue_is_full():
+    scheduler = FetchScheduler(max_workers=1, background_queue_limit=2)
+    gate = block_workers(scheduler)
+
+    queued = [scheduler.submit(time.sleep, 0, priority=Priority.BACKGROUND) for _ in range(2)]
+    shed = scheduler.submit(time.sleep, 0, priority=Priority.BACKGROUND)
+    with pytest.raises(SchedulerBusyError):
+        shed.result(timeout=1)
+    assert scheduler.stats()["shed_background"] == 1
+
+    # Interactive work is never shed
+    interactive = scheduler.submit(time.sleep, 0)
+    gate.set()
+    interactive.result(timeout=1)
+    for future in queued:
+        future.result(timeout=1)
+
+
+def test_cancelled_futures_are_skipped():
+    scheduler = FetchScheduler(max_workers=1)
+    gate = block_workers(scheduler)
+    calls = []
+    cancelled = scheduler.submit(calls.append, "cancelled")
+    assert cancelled.cancel()
+    done = scheduler.submit(calls.append, "ran")
+    gate.set()
+    done.result(timeout=1)
+    assert calls == ["ran"]
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from hn_agent.services import snapshot
+from hn_agent.services.hn_service import HNService
+from hn_agent.services.scheduler import FetchScheduler, TokenBucket
+from hn_agent.services.snapshot import (
+    SnapshotExporter,
+    SnapshotReplay,
+    SnapshotWriter,
+    iter_snapshot,
+    list_partitions,
+)
+
+HOUR_END = datetime(2026, 10, 19, 14, 59, 59, tzinfo=timezone.utc).timestamp()
+
+DOCUMENTS = {
+    "topstories.json": [1, 2],
+    "item/1.json": {"id": 1, "type": "story", "title": "One", "kids": [10]},
+    "item/2.json": {"id": 2, "type": "story", "title": "Two"},
+    "item/10.json": {"id": 10, "type": "comment", "text": "hi", "kids": [11]},
+    "item/11.json": {"id": 11, "type": "comment", "text": "reply"},
+}
+
+
+def make_service(**kwargs):
+    return HNService(
+        scheduler=FetchScheduler(max_workers=4), rate_limiter=TokenBucket(rate_per_second=0), **kwargs
+    )
+
+
+@pytest.fixture
+def live_service():
+    service = make_service()
+    service._fetch_with_retry = lambda url: DOCUMENTS.get(url[len(HNService.BASE_URL) + 1:])
+    return service
+
+
+def test_writer_rolls_parts_and_partitions(tmp_path):
+    with SnapshotWriter(tmp_path, max_rows_per_part=2) as writer:
+        for i in range(3):
+            writer.write(f"item/{i}.json", {"id": i}, fetched_at=HOUR_END)
+        writer.write("item/9.json", {"id": 9}, fetched_at=HOUR_END + 2)
+
+    partitions = list_partitions(tmp_path)
+    assert [p.name for p in partitions] == ["hour=14", "hour=15"]
+    assert len(list(partitions[0].glob("part-*.jsonl.gz"))) == 2
+    assert not list(tmp_path.rglob("*.tmp"))
+    assert [r["data"]["id"] for r in iter_snapshot(tmp_path)] == [0, 1, 2, 9]
+
+
+def test_replay_keeps_last_copy_and_treats_missing_as_none(tmp_path):
+    with SnapshotWriter(tmp_path) as writer:
+        writer.write("item/1.json", {"id": 1, "score": 1}, fetched_at=HOUR_END)
+        writer.write("item/1.json", {"id": 1, "score": 5}, fetched_at=HOUR_END)
+    replay = SnapshotReplay.latest(tmp_path)
+    assert replay.get("item/1.json") == {"id": 1, "score": 5}
+    assert replay.get("item/2.json") is None
+
+
+def test_latest_without_partitions(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SnapshotReplay.latest(tmp_path)
+
+
+def test_export_across_hour_boundary_replays_whole_run(tmp_path, live_service, monkeypatch):
+    clock = iter(HOUR_END + i for i in range(1000))
+    monkeypatch.setattr(snapshot.time, "time", lambda: next(clock))
+
+    with SnapshotWriter(tmp_path) as writer:
+        written = SnapshotExporter(live_service, writer).export(story_count=2)
+    assert written == 5
+    assert len(list_partitions(tmp_path)) == 1
+
+    replayed = make_service(replay=SnapshotReplay.latest(tmp_path))
+    assert [s["id"] for s in replayed.get_top_stories(2)] == [1, 2]
+    assert [c["id"] for c in replayed.get_comment_tree(1)] == [10, 11]
+
+
+def test_export_max_depth(tmp_path, live_service):
+    with SnapshotWriter(tmp_path) as writer:
+        assert SnapshotExporter(live_service, writer).export(story_count=2, max_depth=0) == 3
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        SnapshotWriter(tmp_path, fmt="csv")
+
+
+def test_parquet_parts_have_typed_item_columns(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    documents = {**DOCUMENTS, "item/1.json": {**DOCUMENTS["item/1.json"], "score": 7}}
+    with SnapshotWriter(tmp_path, fmt="parquet") as writer:
+        for path, data in documents.items():
+            writer.write(path, data, fetched_at=HOUR_END)
+
+    (part,) = list_partitions(tmp_path)[0].glob("part-*.parquet")
+    table = pq.read_table(part, columns=["path", "id", "type", "score", "parent"])
+    assert str(table.schema.field("id").type) == "int64"
+    rows = {row["path"]: row for row in table.to_pylist()}
+    assert rows["topstories.json"]["id"] is None
+    assert rows["item/1.json"]["type"] == "story"
+    assert rows["item/1.json"]["score"] == 7
+    assert rows["item/10.json"]["score"] is None
+
+    # Replay still reads the raw documents, and only those columns
+    records = list(iter_snapshot(tmp_path))
+    assert set(records[0]) == {"path", "fetched_at", "data"}
+    assert {r["path"]: r["data"] for r in records}["topstories.json"] == [1, 2]
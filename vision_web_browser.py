@@ -1,6 +1,11 @@
 import argparse
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from io import BytesIO
-from time import sleep
+from time import monotonic, sleep
 
 import helium
 from dotenv import load_dotenv
@@ -41,84 +46,405 @@ def parse_arguments():
         default="gpt-4o",
         help="The model ID to use for the specified model type",
     )
+    parser.add_argument(
+        "--screenshot-size",
+        type=int,
+        nargs=2,
+        default=(800, 1080),
+        metavar=("WIDTH", "HEIGHT"),
+        help="Downscale screenshots to fit within this box",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=int,
+        default=0,
+        help=(
+            "Skip a screenshot of the same URL and scroll position whose perceptual hash is "
+            "within this many bits of the last one (-1 disables)"
+        ),
+    )
+    parser.add_argument(
+        "--settle-timeout",
+        type=float,
+        default=1.0,
+        help="Maximum seconds to wait for the DOM to settle before a screenshot",
+    )
+    parser.add_argument(
+        "--prompts-file",
+        type=str,
+        default=None,
+        help="Run every prompt in this file (one per line) instead of the positional prompt",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        help="Number of worker processes, each with its own pool of pre-launched browsers",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=2,
+        help=(
+            "Browsers kept launched per process; the extra one takes over while "
+            "a recycled browser relaunches"
+        ),
+    )
+    parser.add_argument(
+        "--max-uses",
+        type=int,
+        default=20,
+        help="Recycle a browser after this many tasks",
+    )
+    parser.add_argument(
+        "--headed",
+        action="store_true",
+        help="Show the browser window instead of running headless",
+    )
     return parser.parse_args()
 
 
-def save_screenshot(memory_step: ActionStep, agent: CodeAgent) -> None:
-    sleep(1.0)  # Let JavaScript animations happen before taking the screenshot
-    driver = helium.get_driver()
-    current_step = memory_step.step_number
-    if driver is not None:
-        for previous_memory_step in agent.memory.steps:  # Remove previous screenshots from logs for lean processing
-            if isinstance(previous_memory_step, ActionStep) and previous_memory_step.step_number <= current_step - 2:
-                previous_memory_step.observations_images = None
-        png_bytes = driver.get_screenshot_as_png()
-        image = Image.open(BytesIO(png_bytes))
-        print(f"Captured a browser screenshot: {image.size} pixels")
-        memory_step.observations_images = [image.copy()]  # Create a copy to ensure it persists, important!
-
-    # Update observations with current URL
-    url_info = f"Current url: {driver.current_url}"
-    memory_step.observations = (
-        url_info if memory_step.observations is None else memory_step.observations + "\n" + url_info
-    )
-    return
+@dataclass
+class ScreenshotConfig:
+    """How screenshots are prepared before they reach the model."""
 
+    max_size: tuple = (800, 1080)
+    dedup_threshold: int = 0
+    settle_timeout: float = 1.0
+    settle_interval: float = 0.1
 
-@tool
-def search_item_ctrl_f(text: str, nth_result: int = 1) -> str:
-    """
-    Searches for text on the current page via Ctrl + F and jumps to the nth occurrence.
-    Args:
-        text: The text to search for
-        nth_result: Which occurrence to jump to (default: 1)
+
+# readyState, element count, running finite animations, URL and scroll offset;
+# the page is settled once this is "complete", 0 animations, and unchanged
+# between two polls. Infinite animations (spinners, carousels) never finish,
+# so they are not counted. URL and scroll offset also tell apart screens a
+# tiny hash cannot.
+_DOM_STATE_JS = """
+return [
+    document.readyState,
+    document.getElementsByTagName('*').length,
+    document.getAnimations ? document.getAnimations().filter(
+        a => a.playState === 'running' && !(a.effect && a.effect.getTiming().iterations === Infinity)
+    ).length : 0,
+    location.href,
+    Math.round(window.scrollY),
+];
+"""
+
+
+def wait_for_dom_settle(driver, timeout: float = 1.0, interval: float = 0.1) -> tuple:
+    """Poll until the page stops changing, instead of sleeping a fixed time.
+
+    Returns (seconds waited, last DOM state).
     """
-    elements = driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]")
-    if nth_result > len(elements):
-        raise Exception(f"Match n°{nth_result} not found (only {len(elements)} matches found)")
-    result = f"Found {len(elements)} matches for '{text}'."
-    elem = elements[nth_result - 1]
-    driver.execute_script("arguments[0].scrollIntoView(true);", elem)
-    result += f"Focused on element {nth_result} of {len(elements)}"
-    return result
+    start = monotonic()
+    previous = state = None
+    while monotonic() - start < timeout:
+        state = driver.execute_script(_DOM_STATE_JS)
+        if state == previous and state[0] == "complete" and state[2] == 0:
+            break
+        previous = state
+        sleep(interval)
+    return monotonic() - start, state
 
 
-@tool
-def go_back() -> None:
-    """Goes back to previous page."""
-    driver.back()
+def perceptual_hash(image: Image.Image, hash_size: int = 8) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a tiny grayscale copy."""
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
 
 
-@tool
-def close_popups() -> str:
+def downscale_screenshot(png_bytes: bytes, config: ScreenshotConfig) -> Image.Image:
+    """Downscale a raw PNG screenshot to fit `config.max_size`.
+
+    smolagents re-encodes every observation image as PNG, so a lossy
+    re-encode here would only add artifacts that make that PNG larger.
     """
-    Closes any visible modal or pop-up on the page. Use this to dismiss pop-up windows! This does not work on cookie consent banners.
+    image = Image.open(BytesIO(png_bytes))
+    image.thumbnail(config.max_size, Image.Resampling.LANCZOS)
+    return image.copy()
+
+
+class ScreenshotCallback:
+    """Step callback that attaches a lean screenshot and the current URL to each step."""
+
+    def __init__(self, driver, config: ScreenshotConfig) -> None:
+        self.driver = driver
+        self.config = config
+        self._last_hash = None
+        self._last_position = None  # (URL, scroll offset) of the last kept screenshot
+        self._last_step = None  # Step that holds the most recent kept screenshot
+
+    def __call__(self, memory_step: ActionStep, agent: CodeAgent) -> None:
+        driver = self.driver
+        current_step = memory_step.step_number
+        if driver is not None:
+            waited, state = wait_for_dom_settle(driver, self.config.settle_timeout, self.config.settle_interval)
+            position = tuple(state[3:5]) if state else None
+            image = downscale_screenshot(driver.get_screenshot_as_png(), self.config)
+            image_hash = perceptual_hash(image)
+
+            # A 64-bit hash alone cannot tell two scroll positions of a text page apart
+            unchanged = (
+                self._last_hash is not None
+                and self.config.dedup_threshold >= 0
+                and position is not None
+                and position == self._last_position
+                and bin(image_hash ^ self._last_hash).count("1") <= self.config.dedup_threshold
+            )
+            if unchanged:
+                print(f"Screenshot unchanged since step {self._last_step}, skipped (settled in {waited:.2f}s)")
+                memory_step.observations = self._append(
+                    memory_step.observations, f"Screen unchanged since step {self._last_step}."
+                )
+            else:
+                print(f"Captured a browser screenshot: {image.size} pixels (settled in {waited:.2f}s)")
+                memory_step.observations_images = [image]
+                self._last_hash = image_hash
+                self._last_position = position
+                self._last_step = current_step
+
+            for previous_memory_step in agent.memory.steps:  # Remove previous screenshots from logs for lean processing
+                if (
+                    isinstance(previous_memory_step, ActionStep)
+                    and previous_memory_step.step_number <= current_step - 2
+                    and previous_memory_step.step_number != self._last_step
+                ):
+                    previous_memory_step.observations_images = None
+
+        # Update observations with current URL
+        url_info = f"Current url: {driver.current_url}"
+        memory_step.observations = self._append(memory_step.observations, url_info)
+
+    @staticmethod
+    def _append(observations, text: str) -> str:
+        return text if observations is None else observations + "\n" + text
+
+
+def make_browser_tools(driver) -> list:
+    """Build the browser tools bound to one driver, so concurrent tasks never share state."""
+
+    @tool
+    def search_item_ctrl_f(text: str, nth_result: int = 1) -> str:
+        """
+        Searches for text on the current page via Ctrl + F and jumps to the nth occurrence.
+        Args:
+            text: The text to search for
+            nth_result: Which occurrence to jump to (default: 1)
+        """
+        elements = driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]")
+        if nth_result > len(elements):
+            raise Exception(f"Match n°{nth_result} not found (only {len(elements)} matches found)")
+        result = f"Found {len(elements)} matches for '{text}'."
+        elem = elements[nth_result - 1]
+        driver.execute_script("arguments[0].scrollIntoView(true);", elem)
+        result += f"Focused on element {nth_result} of {len(elements)}"
+        return result
+
+    @tool
+    def go_back() -> None:
+        """Goes back to previous page."""
+        driver.back()
+
+    @tool
+    def close_popups() -> str:
+        """
+        Closes any visible modal or pop-up on the page. Use this to dismiss pop-up windows! This does not work on cookie consent banners.
+        """
+        webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+
+    return [go_back, close_popups, search_item_ctrl_f]
+
+
+def chrome_options(headless: bool = True) -> webdriver.ChromeOptions:
+    """Chrome flags shared by every pooled browser."""
+    options = webdriver.ChromeOptions()
+    options.add_argument("--force-device-scale-factor=1")
+    options.add_argument("--window-size=1000,1350")
+    options.add_argument("--disable-pdf-viewer")
+    options.add_argument("--window-position=0,0")
+    options.add_argument("--disable-dev-shm-usage")
+    if headless:
+        options.add_argument("--headless=new")
+    return options
+
+
+class BrowserPool:
+    """Pre-launched Chrome sessions handed out one task at a time.
+
+    Each task runs in a fresh CDP browser context (its own cookies, storage
+    and cache) that is disposed when the task ends. A session is
+    health-checked when acquired and replaced in the background after
+    `max_uses` tasks or when it fails a check. With `size` above the number
+    of concurrent tasks, a spare session takes over while the recycled one
+    relaunches, so acquisition never waits on a cold browser start unless
+    every session is busy. Acquisition raises once no browser is left alive
+    or after `acquire_timeout` seconds.
     """
-    webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
 
+    def __init__(
+        self, size: int = 2, max_uses: int = 20, headless: bool = True, acquire_timeout: float = 300.0
+    ) -> None:
+        self.max_uses = max_uses
+        self.headless = headless
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._live = size  # Sessions idle, in use or being launched
+        launchers = [threading.Thread(target=self._launch_into_pool) for _ in range(size)]
+        for launcher in launchers:
+            launcher.start()
+        for launcher in launchers:
+            launcher.join()
+        if self._live == 0:
+            raise RuntimeError("Could not launch any browser for the pool (is chromedriver installed?)")
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        """Yield a healthy driver, switched to a fresh browser context, for one task."""
+        deadline = monotonic() + (self.acquire_timeout if timeout is None else timeout)
+        while True:
+            driver, uses = self._acquire(deadline)
+            if self._healthy(driver):
+                try:
+                    home, context = self._isolate(driver)
+                    break
+                except Exception as e:
+                    print(f"Could not open an isolated browser context, relaunching: {e}")
+            self._replace(driver)
+
+        try:
+            yield driver
+        finally:
+            uses += 1
+            if not self._reset(driver, home, context) or uses >= self.max_uses:
+                self._replace(driver)
+            else:
+                self._idle.put((driver, uses))
+
+    def close(self) -> None:
+        self._closed = True
+        while not self._idle.empty():
+            driver, _ = self._idle.get_nowait()
+            self._quit(driver)
+
+    def _acquire(self, deadline: float):
+        while True:
+            try:
+                return self._idle.get(timeout=max(0.0, min(1.0, deadline - monotonic())))
+            except queue.Empty:
+                if self._live == 0:
+                    raise RuntimeError("No browser left in the pool: every relaunch failed")
+                if monotonic() >= deadline:
+                    raise TimeoutError("Timed out waiting for a pooled browser")
+
+    def _launch_into_pool(self) -> None:
+        if not self._closed:
+            try:
+                self._idle.put((self._launch(), 0))
+                return
+            except Exception as e:
+                print(f"Failed to launch a pooled browser: {e}")
+        with self._lock:
+            self._live -= 1
+
+    def _launch(self):
+        return webdriver.Chrome(options=chrome_options(self.headless))
+
+    def _replace(self, driver) -> None:
+        self._quit(driver)
+        threading.Thread(target=self._launch_into_pool, daemon=True).start()
 
-def initialize_driver():
-    """Initialize the Selenium WebDriver."""
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.add_argument("--force-device-scale-factor=1")
-    chrome_options.add_argument("--window-size=1000,1350")
-    chrome_options.add_argument("--disable-pdf-viewer")
-    chrome_options.add_argument("--window-position=0,0")
-    return helium.start_chrome(headless=False, options=chrome_options)
+    @staticmethod
+    def _healthy(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
 
+    @staticmethod
+    def _isolate(driver) -> tuple:
+        """Open a blank tab in a new browser context and switch to it. Returns (home tab, context id)."""
+        home = driver.current_window_handle
+        before = set(driver.window_handles)
+        context = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+        driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank", "browserContextId": context})
+        (tab,) = set(driver.window_handles) - before
+        driver.switch_to.window(tab)
+        return home, context
 
-def initialize_agent(model):
+    @staticmethod
+    def _reset(driver, home: str, context: str) -> bool:
+        """Dispose the task's browser context (its tabs, cookies and storage) and return to the home tab."""
+        try:
+            driver.switch_to.window(home)
+            driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context})
+            for handle in driver.window_handles:
+                if handle != home:  # Tabs the task opened outside its context
+                    driver.switch_to.window(handle)
+                    driver.close()
+            driver.switch_to.window(home)
+            return True
+        except Exception as e:
+            print(f"Browser reset failed, relaunching the browser: {e}")
+            return False
+
+    @staticmethod
+    def _quit(driver) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+def initialize_agent(model, driver, screenshot_config: ScreenshotConfig):
     """Initialize the CodeAgent with the specified model."""
     return CodeAgent(
-        tools=[WebSearchTool(), go_back, close_popups, search_item_ctrl_f],
+        tools=[WebSearchTool(), *make_browser_tools(driver)],
         model=model,
         additional_authorized_imports=["helium"],
-        step_callbacks=[save_screenshot],
+        step_callbacks=[ScreenshotCallback(driver, screenshot_config)],
         max_steps=20,
         verbosity_level=2,
     )
 
 
+def run_task(pool: BrowserPool, model, prompt: str, screenshot_config: ScreenshotConfig):
+    """Run one browsing task on a pooled browser."""
+    with pool.session() as driver:
+        # helium keeps one driver per process, which is why parallel runs use
+        # one process per browser rather than threads.
+        helium.set_driver(driver)
+        agent = initialize_agent(model, driver, screenshot_config)
+        agent.python_executor("from helium import *")
+        return agent.run(prompt + helium_instructions)
+
+
+# Per-process state for --parallel workers, set up once by _init_worker.
+_worker = {}
+
+
+def _init_worker(
+    model_type: str, model_id: str, screenshot_config: ScreenshotConfig, pool_size: int, max_uses: int, headless: bool
+):
+    load_dotenv()
+    _worker["pool"] = BrowserPool(size=pool_size, max_uses=max_uses, headless=headless)
+    _worker["model"] = load_model(model_type, model_id)
+    _worker["config"] = screenshot_config
+
+
+def _run_in_worker(prompt: str) -> str:
+    return str(run_task(_worker["pool"], _worker["model"], prompt, _worker["config"]))
+
+
 helium_instructions = """
 Use your web_search tool when you want to get Google search results.
 Then you can use helium to access websites. Don't use helium for Google search, only for navigating websites!
@@ -183,16 +509,38 @@ def main():
     # Parse command line arguments
     args = parse_arguments()
 
-    # Initialize the model based on the provided arguments
-    model = load_model(args.model_type, args.model_id)
+    screenshot_config = ScreenshotConfig(
+        max_size=tuple(args.screenshot_size),
+        dedup_threshold=args.dedup_threshold,
+        settle_timeout=args.settle_timeout,
+    )
+    headless = not args.headed
+
+    if args.prompts_file:
+        with open(args.prompts_file) as f:
+            prompts = [line.strip() for line in f if line.strip()]
+    else:
+        prompts = [args.prompt]
 
-    global driver
-    driver = initialize_driver()
-    agent = initialize_agent(model)
+    if args.parallel > 1:
+        # One process per browser; each worker launches its browser once and reuses it across tasks
+        with ProcessPoolExecutor(
+            max_workers=args.parallel,
+            initializer=_init_worker,
+            initargs=(args.model_type, args.model_id, screenshot_config, args.pool_size, args.max_uses, headless),
+        ) as executor:
+            for prompt, answer in zip(prompts, executor.map(_run_in_worker, prompts)):
+                print(f"\n=== {prompt[:80]}\n{answer}")
+        return
 
-    # Run the agent with the provided prompt
-    agent.python_executor("from helium import *")
-    agent.run(args.prompt + helium_instructions)
+    # Initialize the model based on the provided arguments
+    model = load_model(args.model_type, args.model_id)
+    pool = BrowserPool(size=args.pool_size, max_uses=args.max_uses, headless=headless)
+    try:
+        for prompt in prompts:
+            run_task(pool, model, prompt, screenshot_config)
+    finally:
+        pool.close()
 
 
 if __name__ == "__main__":